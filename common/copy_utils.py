@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+File copy utilities for media processing
+
+Provides a drop-in replacement for shutil.copy2 that prefers kernel-side
+copy paths over Python's userspace read/write loop:
+- Hard links (opt-in, for scratch copies that are never modified in place)
+- On Linux, a FICLONE reflink (O(1) clone on btrfs/XFS), then
+  os.copy_file_range (zero-copy in the kernel), then os.sendfile, then a
+  256 KiB read/write loop, all on raw file descriptors, with extended
+  attributes copied like shutil.copystat does
+- shutil.copy2 on macOS (fcopyfile) and Windows (1 MiB buffer)
+- A 256 KiB buffered copy elsewhere, where shutil's buffer is 64 KiB on
+  Python versions before 3.14
+"""
+
+import errno
+import os
+import shutil
+import stat
+import sys
+from typing import Union
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# Buffer size for the read/write fallback
+COPY_BUFSIZE = 256 * 1024
+
+# Largest count passed to os.sendfile in one call (Linux caps at ~2 GiB)
+_SENDFILE_MAX_CHUNK = 1 << 30
+
+# ioctl request number for FICLONE (_IOW(0x94, 9, int)) from linux/fs.h
+_FICLONE = 0x40049409
+
+# Errors from FICLONE/os.copy_file_range/os.sendfile that mean "not
+# supported here", in which case the next copy strategy is tried
+_COPY_FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.ENOTTY,
+}
+
+# Errors from copying an extended attribute that mean it can't be copied
+# here (unsupported filesystem, or a namespace we may not write), in which
+# case it is skipped like shutil.copystat does
+_XATTR_SKIP_ERRNOS = {
+    errno.EPERM,
+    errno.EACCES,
+    errno.ENOTSUP,
+    errno.ENODATA,
+    errno.EINVAL,
+}
+
+_USE_FD_COPY = sys.platform.startswith("linux")
+
+# Platforms where shutil.copy2 already uses a fast native path or a large
+# buffer
+_SHUTIL_IS_FAST = sys.platform in ("darwin", "win32")
+
+
+class _IncompleteCopy(Exception):
+    """Raised when a kernel copy call stops short of the expected size"""
+
+
+def _copy_with_ficlone(src_fd: int, dst_fd: int, size: int) -> None:
+    """Share src's extents with dst (reflink), copying no data"""
+    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+
+
+def _copy_with_copy_file_range(src_fd: int, dst_fd: int, size: int) -> None:
+    """Copy size bytes with os.copy_file_range"""
+    remaining = size
+    while remaining > 0:
+        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+        if copied == 0:
+            # Some filesystems report 0 instead of an error for files they
+            # can't copy this way
+            raise _IncompleteCopy()
+        remaining -= copied
+
+
+def _copy_with_sendfile(src_fd: int, dst_fd: int, size: int) -> None:
+    """Copy size bytes with os.sendfile"""
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, min(size - offset, _SENDFILE_MAX_CHUNK))
+        if sent == 0:
+            raise _IncompleteCopy()
+        offset += sent
+
+
+def _copy_with_read_write(src_fd: int, dst_fd: int, size: int) -> None:
+    """Copy until EOF through a reused COPY_BUFSIZE buffer"""
+    buf = bytearray(COPY_BUFSIZE)
+    view = memoryview(buf)
+    with open(src_fd, "rb", buffering=0, closefd=False) as src:
+        while True:
+            n = src.readinto(buf)
+            if not n:
+                break
+            written = 0
+            while written < n:
+                written += os.write(dst_fd, view[written:n])
+
+
+# Tried in order; every strategy but the last may fall back to the next
+_COPY_STRATEGIES = [
+    fn
+    for fn, available in (
+        (_copy_with_ficlone, _USE_FD_COPY and fcntl is not None),
+        (_copy_with_copy_file_range, hasattr(os, "copy_file_range")),
+        (_copy_with_sendfile, hasattr(os, "sendfile")),
+        (_copy_with_read_write, True),
+    )
+    if available
+]
+
+
+def _copy_fd_contents(src_fd: int, dst_fd: int, size: int) -> None:
+    """Copy file contents between descriptors using the fastest strategy"""
+    for copy_fn in _COPY_STRATEGIES[:-1]:
+        try:
+            copy_fn(src_fd, dst_fd, size)
+            return
+        except _IncompleteCopy:
+            pass
+        except OSError as e:
+            if e.errno not in _COPY_FALLBACK_ERRNOS:
+                raise
+        # Start over with the next strategy
+        os.lseek(src_fd, 0, os.SEEK_SET)
+        os.ftruncate(dst_fd, 0)
+        os.lseek(dst_fd, 0, os.SEEK_SET)
+    _COPY_STRATEGIES[-1](src_fd, dst_fd, size)
+
+
+def _copy_xattrs(src_fd: int, dst_fd: int) -> None:
+    """Copy extended attributes, skipping ones this filesystem won't take"""
+    try:
+        names = os.listxattr(src_fd)
+    except OSError as e:
+        if e.errno not in _XATTR_SKIP_ERRNOS:
+            raise
+        return
+    for name in names:
+        try:
+            os.setxattr(dst_fd, name, os.getxattr(src_fd, name))
+        except OSError as e:
+            if e.errno not in _XATTR_SKIP_ERRNOS:
+                raise
+
+
+def _copy_file_fd(src: PathLike, dst: PathLike) -> None:
+    """Copy contents, permission bits and timestamps on raw descriptors
+
+    Raises:
+        shutil.SameFileError: If src and dst refer to the same file
+        OSError: If the copy fails
+    """
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        src_stat = os.fstat(src_fd)
+        # Open without O_TRUNC so an existing hard link to src can be
+        # detected before its contents are destroyed
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT, 0o666)
+        try:
+            dst_stat = os.fstat(dst_fd)
+            if (dst_stat.st_dev, dst_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino):
+                raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+            os.ftruncate(dst_fd, 0)
+
+            _copy_fd_contents(src_fd, dst_fd, src_stat.st_size)
+            copied = os.fstat(dst_fd).st_size
+            if copied != src_stat.st_size:
+                raise OSError(
+                    errno.EIO,
+                    f"Copied {copied} of {src_stat.st_size} bytes from {src!r}",
+                )
+
+            # The copy2 contract, applied on the open descriptor
+            if hasattr(os, "listxattr"):
+                _copy_xattrs(src_fd, dst_fd)
+            os.chmod(dst_fd, stat.S_IMODE(src_stat.st_mode))
+            os.utime(dst_fd, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+def _copy_file_buffered(src: PathLike, dst: PathLike) -> None:
+    """Copy contents through a COPY_BUFSIZE buffer, then metadata
+
+    Raises:
+        shutil.SameFileError: If src and dst refer to the same file
+        OSError: If the copy fails
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFSIZE)
+    shutil.copystat(src, dst)
+
+
+def fast_copy(src: PathLike, dst: PathLike, allow_link: bool = False) -> None:
+    """Copy a file, preserving permission bits, timestamps and extended
+    attributes like shutil.copy2
+
+    Args:
+        src: Source file path
+        dst: Destination file path (overwritten if it exists)
+        allow_link: If True, try to hard link dst to src first. Only use this
+                    for scratch copies that are never modified in place, since
+                    a hard link shares its contents and timestamps with src.
+                    An existing dst is unlinked rather than overwritten, as it
+                    may itself be a hard link to another file.
+
+    Raises:
+        shutil.SameFileError: If src and dst refer to the same file
+        OSError: If the copy fails
+    """
+    if allow_link:
+        try:
+            os.link(src, dst)
+            return
+        except FileExistsError:
+            # Already linked (e.g. the same file referenced twice)
+            if os.path.samefile(src, dst):
+                return
+            # dst may be a hard link to another original file from an earlier
+            # run, so replace it with a new inode rather than writing into it
+            os.unlink(dst)
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass
+        except OSError:
+            # Cross-device or unsupported filesystem. Unlink any existing dst
+            # for the same reason, so the copy below writes a new inode
+            try:
+                os.unlink(dst)
+            except FileNotFoundError:
+                pass
+
+    if _USE_FD_COPY:
+        _copy_file_fd(src, dst)
+    elif _SHUTIL_IS_FAST:
+        shutil.copy2(src, dst)
+    else:
+        _copy_file_buffered(src, dst)
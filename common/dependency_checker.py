@@ -3,14 +3,19 @@
 Dependency Checker for Media Processors
 
 Provides centralized checking for system-level dependencies
-(exiftool, ffmpeg) that are required by various processors.
+(exiftool, ffmpeg) and Pillow, which are required by various processors.
 """
 
 import subprocess
+from functools import lru_cache
 
 
+@lru_cache(maxsize=1)
 def check_exiftool() -> bool:
     """Check if exiftool is installed and available in PATH
+
+    The result is cached, since several processors check it per run and
+    each check starts exiftool.
     
     Returns:
         True if exiftool is available, False otherwise
@@ -22,8 +27,11 @@ def check_exiftool() -> bool:
         return False
 
 
+@lru_cache(maxsize=1)
 def check_ffmpeg() -> bool:
     """Check if ffmpeg is installed and available in PATH
+
+    The result is cached, like check_exiftool().
     
     Returns:
         True if ffmpeg is available, False otherwise
@@ -35,6 +43,22 @@ def check_ffmpeg() -> bool:
         return False
 
 
+@lru_cache(maxsize=1)
+def check_pillow() -> bool:
+    """Check if PIL/Pillow is installed
+
+    The result is cached, so the import system is only searched once.
+
+    Returns:
+        True if Pillow can be imported, False otherwise
+    """
+    try:
+        __import__("PIL")
+        return True
+    except ImportError:
+        return False
+
+
 def print_exiftool_error() -> None:
     """Print installation instructions for exiftool"""
     print("ERROR: exiftool is not installed or not in PATH")
@@ -5,13 +5,20 @@ Batch Exiftool Processing Module
 This module provides batch processing functions for exiftool operations,
 eliminating the need for locks and providing significant performance improvements
 by processing multiple files in single exiftool invocations.
+
+Worker processes can additionally call start_exiftool_session() to keep one
+exiftool process open (-stay_open) for their lifetime; the validate, rebuild,
+read and Instagram Public write helpers then reuse it instead of starting a
+new exiftool (and Perl interpreter) for every call.
 """
 
 import json
 import logging
+import multiprocessing.util
 import os
 import subprocess
 import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
@@ -22,6 +29,225 @@ from common.utils import get_media_type, get_gps_format
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# Persistent exiftool process (-stay_open)
+# ============================================================================
+
+
+class ExiftoolProcess:
+    """A long-running exiftool process driven with -stay_open
+
+    Commands are written to exiftool's stdin as argfile lines, each
+    terminated by a numbered -execute; exiftool prints a matching
+    {readyN} line after each command's output.
+    """
+
+    def __init__(self):
+        self._proc = subprocess.Popen(
+            ["exiftool", "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._last_command = 0
+
+    def execute_many(self, commands: List[List[str]]) -> List[str]:
+        """Run several exiftool commands and return each one's stdout
+
+        Args:
+            commands: Argument lists, one per command (arguments must not
+                      contain newlines)
+
+        Returns:
+            Decoded stdout of each command, in order
+
+        Raises:
+            RuntimeError: If exiftool exits while commands are pending
+        """
+        lines = []
+        first = self._last_command + 1
+        for args in commands:
+            self._last_command += 1
+            lines.extend(args)
+            lines.append(f"-execute{self._last_command}")
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+
+        # Write from a separate thread so a long payload can't deadlock
+        # against exiftool blocking on a full stdout pipe
+        writer = threading.Thread(target=self._write, args=(payload,), daemon=True)
+        writer.start()
+        try:
+            outputs = [self._read_until_ready(n) for n in range(first, self._last_command + 1)]
+        finally:
+            writer.join()
+        return outputs
+
+    def execute(self, args: List[str]) -> str:
+        """Run one exiftool command and return its stdout"""
+        return self.execute_many([args])[0]
+
+    def _write(self, payload: bytes) -> None:
+        try:
+            self._proc.stdin.write(payload)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            # Reported by the reader as an unexpected exit
+            pass
+
+    def _read_until_ready(self, command_number: int) -> str:
+        sentinel = f"{{ready{command_number}}}".encode("ascii")
+        chunks = []
+        readline = self._proc.stdout.readline
+        while True:
+            line = readline()
+            if not line:
+                raise RuntimeError("exiftool exited unexpectedly")
+            if line.rstrip(b"\r\n") == sentinel:
+                return b"".join(chunks).decode("utf-8", errors="replace")
+            chunks.append(line)
+
+    def close(self) -> None:
+        """Ask exiftool to exit, killing it if it doesn't"""
+        try:
+            self._proc.stdin.write(b"-stay_open\nFalse\n")
+            self._proc.stdin.close()
+            self._proc.wait(timeout=10)
+        except Exception:
+            self._proc.kill()
+            self._proc.wait()
+
+
+# The calling process's persistent exiftool, if start_exiftool_session() was used
+_session: Optional[ExiftoolProcess] = None
+# Whether helpers may start _session on first use
+_session_enabled = False
+_session_finalizer_registered = False
+
+
+def start_exiftool_session(lazy: bool = False) -> bool:
+    """Use a persistent exiftool process for the calling process
+
+    Intended for multiprocessing Pool initializers. The process is closed
+    automatically when the worker (or main process) exits cleanly.
+
+    Args:
+        lazy: If True, only start exiftool when a helper first needs it, so
+              pool workers that never receive work don't start one
+
+    Returns:
+        True if the session is running (or will start on first use), False
+        if exiftool couldn't start (helpers then fall back to one exiftool
+        invocation per call)
+    """
+    global _session_enabled, _session_finalizer_registered
+
+    _session_enabled = True
+    if not _session_finalizer_registered:
+        # Unlike atexit handlers, multiprocessing finalizers also run when a
+        # pool worker exits
+        multiprocessing.util.Finalize(None, stop_exiftool_session, exitpriority=10)
+        _session_finalizer_registered = True
+
+    return lazy or _get_session() is not None
+
+
+def _get_session() -> Optional[ExiftoolProcess]:
+    """Return the persistent exiftool, starting it if the session is enabled"""
+    global _session, _session_enabled
+
+    if _session is None and _session_enabled:
+        try:
+            _session = ExiftoolProcess()
+        except OSError as e:
+            logger.debug(f"Could not start persistent exiftool: {e}")
+            _session_enabled = False
+    return _session
+
+
+def stop_exiftool_session() -> None:
+    """Close the persistent exiftool process and stop using a session"""
+    global _session, _session_enabled
+
+    _session_enabled = False
+    if _session is not None:
+        session, _session = _session, None
+        session.close()
+
+
+def _run_exiftool(args: List[str]) -> str:
+    """Run one exiftool command and return its stdout
+
+    Uses the persistent session when one is active, otherwise a new
+    exiftool process with the arguments on the command line.
+    """
+    session = _get_session()
+    if session is not None:
+        try:
+            return session.execute(args)
+        except Exception as e:
+            logger.warning(f"Persistent exiftool failed, falling back: {e}")
+            stop_exiftool_session()
+
+    result = subprocess.run(
+        ["exiftool", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+        stdin=subprocess.DEVNULL,
+    )
+    if result.returncode != 0:
+        logger.debug(f"Exiftool returned non-zero exit code {result.returncode}")
+        if result.stderr:
+            logger.debug(f"Exiftool stderr: {result.stderr[:500]}")
+    return result.stdout
+
+
+def _run_exiftool_commands(commands: List[List[str]]) -> str:
+    """Run several exiftool commands and return their combined stdout
+
+    Uses the persistent session when one is active, otherwise a single
+    exiftool invocation reading the commands from a temporary argfile
+    (separated by -execute).
+    """
+    session = _get_session()
+    if session is not None:
+        try:
+            return "".join(session.execute_many(commands))
+        except Exception as e:
+            logger.warning(f"Persistent exiftool failed, falling back: {e}")
+            stop_exiftool_session()
+
+    argfile_path: Optional[str] = None
+    try:
+        # Use process ID to ensure unique temp files per worker
+        with tempfile.NamedTemporaryFile(
+            mode="w",
+            prefix=f"exiftool_{os.getpid()}_",
+            suffix=".args",
+            delete=False,
+        ) as argfile:
+            argfile_path = argfile.name
+            for args in commands:
+                for arg in args:
+                    argfile.write(f"{arg}\n")
+                argfile.write("-execute\n")
+
+        result = subprocess.run(
+            ["exiftool", "-@", argfile_path],
+            capture_output=True,
+            text=True,
+            check=False,
+            stdin=subprocess.DEVNULL,
+        )
+        return result.stdout
+    finally:
+        if argfile_path is not None:
+            try:
+                os.unlink(argfile_path)
+            except OSError:
+                pass
+
+
 def batch_validate_exif(file_paths: List[str]) -> Set[str]:
     """Validate EXIF structure for multiple files in one exiftool call
 
@@ -48,21 +274,14 @@ def batch_validate_exif(file_paths: List[str]) -> Set[str]:
         chunk = file_paths[i : i + chunk_size]
         try:
             # Use exiftool to validate files in this chunk
-            cmd = ["exiftool", "-validate", "-warning"]
-            cmd.extend([str(path) for path in chunk])
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=False,
-                stdin=subprocess.DEVNULL,
+            stdout = _run_exiftool(
+                ["-validate", "-warning", *[str(path) for path in chunk]]
             )
 
             # Parse output to identify corrupted files
             # Format: "Warning: [minor] ... - {filename}"
             current_file = None
-            for line in result.stdout.strip().split("\n"):
+            for line in stdout.strip().split("\n"):
                 if not line:
                     continue
 
@@ -101,59 +320,34 @@ def batch_rebuild_exif(file_paths: List[str]) -> None:
     chunk_size = 500
     for i in range(0, len(file_paths), chunk_size):
         chunk = file_paths[i : i + chunk_size]
-        argfile_path: Optional[str] = None
 
         try:
-            # Create temporary argfile for batch processing
-            # Use process ID to ensure unique temp files per worker
-            with tempfile.NamedTemporaryFile(
-                mode="w",
-                prefix=f"exiftool_{os.getpid()}_",
-                suffix=".args",
-                delete=False,
-            ) as argfile:
-                argfile_path = argfile.name
-
-                # Write commands for each file using -execute separator
-                for file_path in chunk:
-                    argfile.write("-ignoreMinorErrors\n")
-                    argfile.write("-overwrite_original\n")
-                    argfile.write("-all=\n")
-                    argfile.write("-tagsfromfile\n")
-                    argfile.write("@\n")
-                    argfile.write("-all:all\n")
-                    argfile.write("-unsafe\n")
-                    argfile.write(f"{file_path}\n")
-                    argfile.write("-execute\n")
-
-            # Run exiftool with argfile
-            cmd = ["exiftool", "-@", argfile_path]
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=False,
-                stdin=subprocess.DEVNULL,
+            # One command per file, separated by -execute
+            stdout = _run_exiftool_commands(
+                [
+                    [
+                        "-ignoreMinorErrors",
+                        "-overwrite_original",
+                        "-all=",
+                        "-tagsfromfile",
+                        "@",
+                        "-all:all",
+                        "-unsafe",
+                        str(file_path),
+                    ]
+                    for file_path in chunk
+                ]
             )
 
             # Count successes
-            success_count = result.stdout.count("image files updated")
+            success_count = stdout.count("image files updated")
             if success_count > 0:
                 logger.debug(
                     f"Successfully rebuilt EXIF for {success_count} files in chunk"
                 )
 
-            # Clean up argfile
-            os.unlink(argfile_path)
-
         except Exception as e:
             logger.warning(f"Failed to batch rebuild EXIF for chunk: {e}")
-            # Try to clean up argfile if it exists
-            try:
-                if argfile_path is not None:
-                    os.unlink(argfile_path)
-            except Exception:
-                pass
 
 
 def batch_read_existing_metadata(file_paths: List[str]) -> Dict[str, Dict[str, bool]]:
@@ -234,10 +428,12 @@ def _read_metadata_batch(file_paths: List[str]) -> Dict[str, Dict[str, bool]]:
 
     metadata_map = {}
 
-    # Use exiftool with JSON output for easy parsing
-    cmd = [
-        "exiftool",
+    # Use exiftool with JSON output for easy parsing. -fast skips scanning
+    # JPEG trailers, where none of these tags live; -fast2 is not used since
+    # it stops at the mdat atom of videos that store their metadata after it
+    args = [
         "-ignoreMinorErrors",
+        "-fast",
         "-json",
         "-s",
         "-DateTimeOriginal",
@@ -250,29 +446,16 @@ def _read_metadata_batch(file_paths: List[str]) -> Dict[str, Dict[str, bool]]:
         "-GPSLongitude",
         "-GPSAltitude",
     ]
-    cmd.extend([str(path) for path in file_paths])
-
-    # Don't use check=True - handle errors manually
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        check=False,  # Changed from True to handle errors gracefully
-        stdin=subprocess.DEVNULL,
-    )
+    args.extend([str(path) for path in file_paths])
 
-    # Check for serious errors (not just missing files)
-    if result.returncode != 0:
-        logger.debug(f"Exiftool returned non-zero exit code {result.returncode}")
-        if result.stderr:
-            logger.debug(f"Exiftool stderr: {result.stderr[:500]}")
-
-        # Still try to parse whatever output we got
-        if not result.stdout:
-            raise Exception(f"No output from exiftool (exit code {result.returncode})")
+    # Errors are handled here rather than by exit code; partial output from
+    # a failing run is still parsed
+    stdout = _run_exiftool(args)
+    if not stdout:
+        raise Exception("No output from exiftool")
 
     # Parse JSON output
-    metadata_list = json.loads(result.stdout)
+    metadata_list = json.loads(stdout)
 
     for item in metadata_list:
         source_file = item.get("SourceFile")
@@ -751,111 +934,89 @@ def batch_write_metadata_instagram_public(
     for chunk in chunked_progress(
         file_info, chunk_size, PHASE_EXIF, "Writing metadata"
     ):
-        argfile_path: Optional[str] = None
         try:
-            with tempfile.NamedTemporaryFile(
-                mode="w",
-                prefix=f"exiftool_{os.getpid()}_",
-                suffix=".args",
-                delete=False,
-            ) as argfile:
-                argfile_path = argfile.name
-
-                for file_path, post_data, export_username, media_type_category in chunk:
-                    existing_fields = existing_metadata_map.get(file_path, {})
-
-                    argfile.write("-E\n")  # Enable HTML character entities
-                    argfile.write("-api\n")
-                    argfile.write("largefilesupport=1\n")
-                    argfile.write("-overwrite_original\n")
-
-                    # Log what metadata is being embedded
-                    logger.debug(f"Embedding metadata for: {Path(file_path).name}")
-
-                    # Add date/time metadata only if not already present
-                    date_str = post_data["timestamp"]
-                    if date_str:
-                        exif_date = date_str.replace("-", ":")
-                        if not existing_fields.get("DateTimeOriginal", False):
-                            argfile.write(f"-DateTimeOriginal={exif_date}\n")
-                        if not existing_fields.get("CreateDate", False):
-                            argfile.write(f"-CreateDate={exif_date}\n")
-                        if not existing_fields.get("ModifyDate", False):
-                            argfile.write(f"-ModifyDate={exif_date}\n")
-                        logger.debug(f"  DateTime: {exif_date}")
-
-                    # Add GPS coordinates if available and not already present
-                    if (
-                        post_data.get("latitude") is not None
-                        and post_data.get("longitude") is not None
-                        and not existing_fields.get("GPSLatitude", False)
-                    ):
-                        lat = float(post_data["latitude"])
-                        lon = float(post_data["longitude"])
-
-                        gps_format = get_gps_format(file_path)
-                        logger.debug(
-                            f"  GPS: lat={lat}, lon={lon} (format={gps_format})"
-                        )
+            # One command per file, separated by -execute
+            commands = []
+            for file_path, post_data, export_username, media_type_category in chunk:
+                existing_fields = existing_metadata_map.get(file_path, {})
+
+                args = [
+                    "-E",  # Enable HTML character entities
+                    "-api",
+                    "largefilesupport=1",
+                    "-overwrite_original",
+                ]
+
+                # Log what metadata is being embedded
+                logger.debug(f"Embedding metadata for: {Path(file_path).name}")
+
+                # Add date/time metadata only if not already present
+                date_str = post_data["timestamp"]
+                if date_str:
+                    exif_date = date_str.replace("-", ":")
+                    if not existing_fields.get("DateTimeOriginal", False):
+                        args.append(f"-DateTimeOriginal={exif_date}")
+                    if not existing_fields.get("CreateDate", False):
+                        args.append(f"-CreateDate={exif_date}")
+                    if not existing_fields.get("ModifyDate", False):
+                        args.append(f"-ModifyDate={exif_date}")
+                    logger.debug(f"  DateTime: {exif_date}")
+
+                # Add GPS coordinates if available and not already present
+                if (
+                    post_data.get("latitude") is not None
+                    and post_data.get("longitude") is not None
+                    and not existing_fields.get("GPSLatitude", False)
+                ):
+                    lat = float(post_data["latitude"])
+                    lon = float(post_data["longitude"])
+
+                    gps_format = get_gps_format(file_path)
+                    logger.debug(
+                        f"  GPS: lat={lat}, lon={lon} (format={gps_format})"
+                    )
 
-                        if gps_format == "absolute":
-                            argfile.write(f"-GPSLatitude={abs(lat)}\n")
-                            argfile.write(
-                                f"-GPSLatitudeRef={'N' if lat >= 0 else 'S'}\n"
-                            )
-                            argfile.write(f"-GPSLongitude={abs(lon)}\n")
-                            argfile.write(
-                                f"-GPSLongitudeRef={'E' if lon >= 0 else 'W'}\n"
-                            )
-                        else:
-                            argfile.write(f"-GPSLatitude={lat}\n")
-                            argfile.write(f"-GPSLongitude={lon}\n")
+                    if gps_format == "absolute":
+                        args.append(f"-GPSLatitude={abs(lat)}")
+                        args.append(f"-GPSLatitudeRef={'N' if lat >= 0 else 'S'}")
+                        args.append(f"-GPSLongitude={abs(lon)}")
+                        args.append(f"-GPSLongitudeRef={'E' if lon >= 0 else 'W'}")
+                    else:
+                        args.append(f"-GPSLatitude={lat}")
+                        args.append(f"-GPSLongitude={lon}")
 
-                    # Build source description with caption
-                    source_description = (
-                        f"Source: Instagram/{export_username}/{media_type_category}"
-                    )
+                # Build source description with caption
+                source_description = (
+                    f"Source: Instagram/{export_username}/{media_type_category}"
+                )
 
-                    if post_data.get("caption"):
-                        # Replace newlines in caption with HTML entity to avoid breaking argfile
-                        caption = post_data["caption"].replace("\n", "&#xa;")
-                        source_description += f'&#xa;Caption: "{caption}"'
-                        logger.debug(f"  Caption: {caption[:100]}...")
+                if post_data.get("caption"):
+                    # Replace newlines in caption with HTML entity to keep it one argument
+                    caption = post_data["caption"].replace("\n", "&#xa;")
+                    source_description += f'&#xa;Caption: "{caption}"'
+                    logger.debug(f"  Caption: {caption[:100]}...")
 
-                    file_media_type = get_media_type(file_path)
-                    logger.debug(f"  Media type: {file_media_type}")
-                    logger.debug(f"  Source description: {source_description[:150]}...")
+                file_media_type = get_media_type(file_path)
+                logger.debug(f"  Media type: {file_media_type}")
+                logger.debug(f"  Source description: {source_description[:150]}...")
 
-                    # Always write description fields (source context is valuable)
-                    if file_media_type == "image":
-                        argfile.write(f"-ImageDescription={source_description}\n")
-                        argfile.write(f"-IPTC:Caption-Abstract={source_description}\n")
-                    elif file_media_type == "video":
-                        argfile.write(f"-Comment={source_description}\n")
-                        argfile.write(f"-Description={source_description}\n")
+                # Always write description fields (source context is valuable)
+                if file_media_type == "image":
+                    args.append(f"-ImageDescription={source_description}")
+                    args.append(f"-IPTC:Caption-Abstract={source_description}")
+                elif file_media_type == "video":
+                    args.append(f"-Comment={source_description}")
+                    args.append(f"-Description={source_description}")
 
-                    argfile.write(f"{file_path}\n")
-                    argfile.write("-execute\n")
+                args.append(file_path)
+                commands.append(args)
 
-            cmd = ["exiftool", "-@", argfile_path]
-            subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=False,
-                stdin=subprocess.DEVNULL,
-            )
-            os.unlink(argfile_path)
+            _run_exiftool_commands(commands)
 
         except Exception as e:
             logger.warning(
                 f"Failed to batch write metadata for instagram_public chunk: {e}"
             )
-            try:
-                if argfile_path is not None:
-                    os.unlink(argfile_path)
-            except Exception:
-                pass
 
 
 def batch_write_metadata_instagram_old_public(
@@ -1016,94 +1177,72 @@ def batch_write_metadata_snapchat_memories(
     for chunk in chunked_progress(
         filtered_info, chunk_size, PHASE_EXIF, "Writing metadata"
     ):
-        argfile_path: Optional[str] = None
         try:
-            with tempfile.NamedTemporaryFile(
-                mode="w",
-                prefix=f"exiftool_{os.getpid()}_",
-                suffix=".args",
-                delete=False,
-            ) as argfile:
-                argfile_path = argfile.name
-
-                for file_path, memory_data, export_username in chunk:
-                    existing_fields = existing_metadata_map.get(file_path, {})
-
-                    argfile.write("-E\n")  # Enable HTML character entities
-                    argfile.write("-api\n")
-                    argfile.write("largefilesupport=1\n")
-                    argfile.write("-overwrite_original\n")
-
-                    # Add date/time metadata only if not already present
-                    date_str = memory_data["date"]
-                    if date_str:
-                        exif_date = date_str.replace("-", ":").replace(" UTC", "")
-                        if not existing_fields.get("DateTimeOriginal", False):
-                            argfile.write(f"-DateTimeOriginal={exif_date}\n")
-                        if not existing_fields.get("CreateDate", False):
-                            argfile.write(f"-CreateDate={exif_date}\n")
-                        if not existing_fields.get("ModifyDate", False):
-                            argfile.write(f"-ModifyDate={exif_date}\n")
-
-                    # Add GPS coordinates if available and not already present
-                    if (
-                        "latitude" in memory_data
-                        and "longitude" in memory_data
-                        and not existing_fields.get("GPSLatitude", False)
-                    ):
-                        lat = float(memory_data["latitude"])
-                        lon = float(memory_data["longitude"])
-
-                        gps_format = get_gps_format(file_path)
-
-                        if gps_format == "absolute":
-                            argfile.write(f"-GPSLatitude={abs(lat)}\n")
-                            argfile.write(
-                                f"-GPSLatitudeRef={'N' if lat >= 0 else 'S'}\n"
-                            )
-                            argfile.write(f"-GPSLongitude={abs(lon)}\n")
-                            argfile.write(
-                                f"-GPSLongitudeRef={'E' if lon >= 0 else 'W'}\n"
-                            )
-                        else:
-                            argfile.write(f"-GPSLatitude={lat}\n")
-                            argfile.write(f"-GPSLongitude={lon}\n")
+            # One command per file, separated by -execute
+            commands = []
+            for file_path, memory_data, export_username in chunk:
+                existing_fields = existing_metadata_map.get(file_path, {})
+
+                args = [
+                    "-E",  # Enable HTML character entities
+                    "-api",
+                    "largefilesupport=1",
+                    "-overwrite_original",
+                ]
+
+                # Add date/time metadata only if not already present
+                date_str = memory_data["date"]
+                if date_str:
+                    exif_date = date_str.replace("-", ":").replace(" UTC", "")
+                    if not existing_fields.get("DateTimeOriginal", False):
+                        args.append(f"-DateTimeOriginal={exif_date}")
+                    if not existing_fields.get("CreateDate", False):
+                        args.append(f"-CreateDate={exif_date}")
+                    if not existing_fields.get("ModifyDate", False):
+                        args.append(f"-ModifyDate={exif_date}")
+
+                # Add GPS coordinates if available and not already present
+                if (
+                    "latitude" in memory_data
+                    and "longitude" in memory_data
+                    and not existing_fields.get("GPSLatitude", False)
+                ):
+                    lat = float(memory_data["latitude"])
+                    lon = float(memory_data["longitude"])
+
+                    gps_format = get_gps_format(file_path)
+
+                    if gps_format == "absolute":
+                        args.append(f"-GPSLatitude={abs(lat)}")
+                        args.append(f"-GPSLatitudeRef={'N' if lat >= 0 else 'S'}")
+                        args.append(f"-GPSLongitude={abs(lon)}")
+                        args.append(f"-GPSLongitudeRef={'E' if lon >= 0 else 'W'}")
+                    else:
+                        args.append(f"-GPSLatitude={lat}")
+                        args.append(f"-GPSLongitude={lon}")
 
-                    # Build source description
-                    source_description = f"Source: Snapchat/{export_username}/memories"
+                # Build source description
+                source_description = f"Source: Snapchat/{export_username}/memories"
 
-                    media_type = get_media_type(file_path)
+                media_type = get_media_type(file_path)
 
-                    # Always write description fields (source context is valuable)
-                    if media_type == "image":
-                        argfile.write(f"-ImageDescription={source_description}\n")
-                        argfile.write(f"-IPTC:Caption-Abstract={source_description}\n")
-                    elif media_type == "video":
-                        argfile.write(f"-Comment={source_description}\n")
-                        argfile.write(f"-Description={source_description}\n")
+                # Always write description fields (source context is valuable)
+                if media_type == "image":
+                    args.append(f"-ImageDescription={source_description}")
+                    args.append(f"-IPTC:Caption-Abstract={source_description}")
+                elif media_type == "video":
+                    args.append(f"-Comment={source_description}")
+                    args.append(f"-Description={source_description}")
 
-                    argfile.write(f"{file_path}\n")
-                    argfile.write("-execute\n")
+                args.append(file_path)
+                commands.append(args)
 
-            cmd = ["exiftool", "-@", argfile_path]
-            subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=False,
-                stdin=subprocess.DEVNULL,
-            )
-            os.unlink(argfile_path)
+            _run_exiftool_commands(commands)
 
         except Exception as e:
             logger.warning(
                 f"Failed to batch write metadata for snapchat_memories chunk: {e}"
             )
-            try:
-                if argfile_path is not None:
-                    os.unlink(argfile_path)
-            except Exception:
-                pass
 
 
 def batch_write_metadata_snapchat_messages(
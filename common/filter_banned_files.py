@@ -35,6 +35,13 @@ class BannedFilesFilter:
         self.patterns = self.BANNED_PATTERNS.copy()
         if additional_patterns:
             self.patterns.extend(additional_patterns)
+        self._update_prefixes()
+
+    def _update_prefixes(self) -> None:
+        """Refresh the tuple of patterns passed to str.startswith"""
+        # Every pattern matches exactly or as a prefix, and an exact match is
+        # also a prefix match, so one C-level startswith call checks them all
+        self._prefixes = tuple(self.patterns)
 
     def is_banned(self, path: Path) -> bool:
         """
@@ -46,14 +53,23 @@ class BannedFilesFilter:
         Returns:
             True if the path matches any banned pattern, False otherwise
         """
-        name = path.name
+        return self.is_banned_name(path.name)
+
+    def is_banned_name(self, name: str) -> bool:
+        """
+        Check if a bare file or directory name matches any banned pattern
 
-        for pattern in self.patterns:
-            # Exact match or prefix match (for patterns like ._ and SYNOFILE_THUMB_)
-            if name == pattern or name.startswith(pattern):
-                return True
+        Useful with os.scandir, where entries already carry their name and
+        building a Path object just to check it would be wasted work.
 
-        return False
+        Args:
+            name: File or directory name (no path components)
+
+        Returns:
+            True if the name matches any banned pattern, False otherwise
+        """
+        # Exact match or prefix match (for patterns like ._ and SYNOFILE_THUMB_)
+        return name.startswith(self._prefixes)
 
     def add_pattern(self, pattern: str) -> None:
         """
@@ -64,6 +80,7 @@ class BannedFilesFilter:
         """
         if pattern not in self.patterns:
             self.patterns.append(pattern)
+            self._update_prefixes()
 
     def remove_pattern(self, pattern: str) -> None:
         """
@@ -74,6 +91,7 @@ class BannedFilesFilter:
         """
         if pattern in self.patterns:
             self.patterns.remove(pattern)
+            self._update_prefixes()
 
     def get_patterns(self) -> List[str]:
         """
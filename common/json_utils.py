@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+JSON serialization helpers
+
+Uses orjson (a C implementation, several times faster than the stdlib
+encoder and decoder) when it is installed, and falls back to the stdlib
+json module otherwise. Output is always UTF-8 bytes with non-ASCII
+characters left unescaped, matching json.dump(..., ensure_ascii=False).
+
+When ijson is installed, large documents can also be read incrementally
+with iter_array(), iter_items(), load_key() and load_first_item() instead
+of being parsed into memory whole, and checked with validate_object()
+without building any values.
+"""
+
+import json
+from typing import Any, Iterator, Optional, Tuple, Union
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ijson
+
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON bytes
+
+    Args:
+        obj: Object to serialize (dicts must have string keys)
+        indent: If True, pretty-print with 2-space indentation
+
+    Returns:
+        Encoded JSON document
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(
+        obj, indent=2 if indent else None, ensure_ascii=False
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize a JSON document from bytes or str
+
+    Raises:
+        ValueError: If data is not valid JSON (json.JSONDecodeError or
+                    orjson.JSONDecodeError, both ValueError subclasses)
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_array(path: str, key: Optional[str] = None) -> Iterator[Any]:
+    """Yield the items of a top-level array in a JSON file
+
+    Streams with ijson when installed, so only one item is in memory at a
+    time. Otherwise the whole document is loaded first.
+
+    Args:
+        path: Path to a JSON file whose root is an object, or whose root is
+              the array itself when key is None
+        key: Top-level key holding the array, or None for a root array
+
+    Yields:
+        Array items in document order (nothing if key is missing)
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    if HAS_IJSON:
+        prefix = "item" if key is None else f"{key}.item"
+        with open(path, "rb") as f:
+            try:
+                yield from ijson.items(f, prefix, use_float=True)
+            except ijson.JSONError as e:
+                raise ValueError(f"Invalid JSON in {path}: {e}") from e
+        return
+
+    with open(path, "rb") as f:
+        document = loads(f.read())
+    yield from document if key is None else document.get(key, [])
+
+
+def iter_items(path: str) -> Iterator[Tuple[str, Any]]:
+    """Yield the (key, value) pairs of a JSON file whose root is an object
+
+    Streams with ijson when installed, so only one value is in memory at a
+    time. Otherwise the whole document is loaded first.
+
+    Args:
+        path: Path to a JSON file whose root is an object
+
+    Yields:
+        (key, value) pairs in document order
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    if HAS_IJSON:
+        with open(path, "rb") as f:
+            try:
+                yield from ijson.kvitems(f, "", use_float=True)
+            except ijson.JSONError as e:
+                raise ValueError(f"Invalid JSON in {path}: {e}") from e
+        return
+
+    with open(path, "rb") as f:
+        document = loads(f.read())
+    yield from document.items()
+
+
+def validate_object(path: str) -> None:
+    """Check that a JSON file is a valid document whose root is an object
+
+    With ijson the file is parsed as a stream of events without building
+    any values, so this is cheap to run before streaming it with
+    iter_items(), where an error would otherwise only surface partway.
+
+    Args:
+        path: Path to a JSON file
+
+    Raises:
+        ValueError: If the document is not valid JSON or its root is not an
+                    object
+    """
+    if HAS_IJSON:
+        with open(path, "rb") as f:
+            try:
+                events = ijson.parse(f, use_float=True)
+                first = next(events, None)
+                if first is None or first[1] != "start_map":
+                    raise ValueError(f"Root of {path} is not a JSON object")
+                for _ in events:
+                    pass
+            except ijson.JSONError as e:
+                raise ValueError(f"Invalid JSON in {path}: {e}") from e
+        return
+
+    with open(path, "rb") as f:
+        document = loads(f.read())
+    if not isinstance(document, dict):
+        raise ValueError(f"Root of {path} is not a JSON object")
+
+
+def load_key(path: str, key: str, default: Any = None) -> Any:
+    """Load a single top-level value from a JSON file
+
+    With ijson, parsing stops as soon as the value has been read, which is
+    cheap for keys that come before large arrays.
+
+    Args:
+        path: Path to a JSON file whose root is an object
+        key: Top-level key to read
+        default: Value returned when key is missing
+
+    Returns:
+        The decoded value, or default
+    """
+    if HAS_IJSON:
+        with open(path, "rb") as f:
+            return next(ijson.items(f, key, use_float=True), default)
+
+    with open(path, "rb") as f:
+        return loads(f.read()).get(key, default)
+
+
+def load_first_item(path: str) -> Any:
+    """Load the first item of a JSON file whose root is an array
+
+    With ijson, only the start of the file is parsed, which makes this cheap
+    for format detection on large exports.
+
+    Args:
+        path: Path to a JSON file
+
+    Returns:
+        The first array item, or None if the root is not an array or is empty
+
+    Raises:
+        ValueError: If the start of the document is not valid JSON
+    """
+    if HAS_IJSON:
+        with open(path, "rb") as f:
+            try:
+                return next(ijson.items(f, "item", use_float=True), None)
+            except ijson.JSONError as e:
+                raise ValueError(f"Invalid JSON in {path}: {e}") from e
+
+    with open(path, "rb") as f:
+        document = loads(f.read())
+    if isinstance(document, list) and document:
+        return document[0]
+    return None
@@ -776,6 +776,7 @@ def _pass4_embed_metadata(
     output_path: Path,
     metadata: Optional[dict] = None,
     export_username: Optional[str] = None,
+    clear_metadata: bool = False,
 ) -> bool:
     """
     PASS 4: Embed metadata into final video and move to output location.
@@ -798,6 +799,8 @@ def _pass4_embed_metadata(
                   For messages: also 'conversation_type', 'conversation_id',
                   'conversation_title', 'sender', 'content'
         export_username: Optional username for source metadata
+        clear_metadata: If True, drop metadata already in video_path (e.g. a
+                        finished MKV tagged for another memory) before adding
 
     Returns:
         True if successful, False otherwise
@@ -809,6 +812,7 @@ def _pass4_embed_metadata(
         "ffmpeg",
         "-i",
         str(video_path),
+        *(["-map_metadata", "-1"] if clear_metadata else []),
         # Explicitly map all streams to preserve both video tracks
         "-map",
         "0:v:0",  # Map first video stream (with overlay)
@@ -959,10 +963,23 @@ def create_image_with_overlay(
             logger.warning(f"Overlay file does not exist: {overlay_path}")
             return False
 
+        is_jpeg_output = output_path.suffix.lower() in [".jpg", ".jpeg"]
+
         # Open the base image
         with Image.open(image_path) as base_img:
-            # Convert to RGBA if not already
-            if base_img.mode != "RGBA":
+            # An opaque base going to JPEG can take the overlay in a single
+            # masked paste, which gives the same pixels as alpha_composite
+            # followed by flattening onto white, without either extra pass
+            paste_onto_base = (
+                is_jpeg_output
+                and "A" not in base_img.getbands()
+                and "transparency" not in base_img.info
+            )
+            if paste_onto_base:
+                if base_img.mode != "RGB":
+                    base_img = base_img.convert("RGB")
+            elif base_img.mode != "RGBA":
+                # Convert to RGBA if not already
                 base_img = base_img.convert("RGBA")
 
             # Open the overlay image - catch specific PIL errors
@@ -978,11 +995,16 @@ def create_image_with_overlay(
                             base_img.size, Image.Resampling.LANCZOS
                         )
 
+                    if paste_onto_base:
+                        base_img.paste(overlay_img, (0, 0), overlay_img)
+                        base_img.save(output_path, quality=quality, optimize=True)
+                        return True
+
                     # Composite overlay on top of base image
                     result_img = Image.alpha_composite(base_img, overlay_img)
 
                     # Convert back to RGB for JPEG files
-                    if output_path.suffix.lower() in [".jpg", ".jpeg"]:
+                    if is_jpeg_output:
                         # Create white background for JPEG
                         rgb_img = Image.new("RGB", result_img.size, (255, 255, 255))
                         rgb_img.paste(result_img, mask=result_img.split()[-1])
@@ -1109,3 +1131,33 @@ def create_video_with_overlay(
                     f"[{video_path.name}] Failed to clean up {temp_file.name}: {e}"
                 )
 
+
+def retag_video_with_overlay(
+    source_path: Path,
+    output_path: Path,
+    metadata: Optional[dict] = None,
+    export_username: Optional[str] = None,
+) -> bool:
+    """
+    Copy an MKV made by create_video_with_overlay, replacing its metadata.
+
+    For a memory whose video and overlay are identical to one already
+    encoded: only Pass 4 runs (a stream copy), skipping the rotate and
+    overlay encodes.
+
+    Args:
+        source_path: MKV previously written by create_video_with_overlay
+        output_path: Path for the output MKV file
+        metadata: Optional dict with 'date', 'latitude', 'longitude' for embedding
+        export_username: Optional username for source metadata
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        return _pass4_embed_metadata(
+            source_path, output_path, metadata, export_username, clear_metadata=True
+        )
+    except Exception as e:
+        logger.error(f"[{source_path.name}] Retagging failed: {e}")
+        return False
@@ -6,6 +6,7 @@ Provides standardized progress bar formatting with phase prefixes to clearly
 indicate which stage of processing is active.
 """
 
+import multiprocessing
 from concurrent.futures import as_completed
 from typing import Dict, Iterable, List, Optional, TypeVar
 
@@ -41,6 +42,29 @@ def progress_bar(
     return tqdm(iterable, desc=f"[{phase}] {action}", total=total, unit=unit)
 
 
+def counter_progress(
+    total: int,
+    phase: str,
+    action: str,
+    unit: str = "file",
+) -> tqdm:
+    """Standardized progress bar advanced manually with update(n).
+
+    For work that completes in groups (e.g. batches of files) while the bar
+    should count individual items.
+
+    Args:
+        total: Total number of items
+        phase: Phase name (use PHASE_* constants)
+        action: Action description (e.g., "Creating files")
+        unit: Unit name for display
+
+    Returns:
+        tqdm progress bar (use as a context manager)
+    """
+    return tqdm(total=total, desc=f"[{phase}] {action}", unit=unit)
+
+
 def futures_progress(
     futures_dict: Dict,
     phase: str,
@@ -84,6 +108,11 @@ def chunked_progress(
 
     Yields:
         Chunks of items with progress bar
+
+    No bar is drawn in child processes such as pool workers, where bars
+    from several workers would interleave with the parent's; the parent
+    reports progress for work it hands out to them.
     """
     chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
-    yield from tqdm(chunks, desc=f"[{phase}] {action}", unit=unit)
+    in_child = multiprocessing.current_process().name != "MainProcess"
+    yield from tqdm(chunks, desc=f"[{phase}] {action}", unit=unit, disable=in_child)
@@ -7,7 +7,7 @@ import logging
 import os
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 # Re-export logging functions from centralized logging module for backwards compatibility
 
@@ -244,11 +244,15 @@ def should_cleanup_temp() -> bool:
 # ============================================================================
 
 
-def is_preprocessed_directory(input_dir: str) -> bool:
+def is_preprocessed_directory(
+    input_dir: str, metadata_files: Sequence[str] = ("metadata.json",)
+) -> bool:
     """Check if directory has been preprocessed.
 
     A preprocessed directory contains:
     - metadata.json: Consolidated metadata from the preprocessing step
+      (processors whose preprocessor writes other formats pass those
+      filenames as metadata_files; any one of them counts)
     - media/: Directory containing copied/organized media files
 
     This is used by processors to determine whether to run preprocessing
@@ -256,9 +260,10 @@ def is_preprocessed_directory(input_dir: str) -> bool:
 
     Args:
         input_dir: Path to the directory to check
+        metadata_files: Metadata filenames the calling processor can read
 
     Returns:
-        True if directory contains metadata.json and media/, False otherwise
+        True if directory contains one of metadata_files and media/, False otherwise
 
     Example:
         >>> is_preprocessed_directory("/path/to/raw_export")
@@ -267,10 +272,10 @@ def is_preprocessed_directory(input_dir: str) -> bool:
         True
     """
     input_path = Path(input_dir)
-    metadata_file = input_path / "metadata.json"
     media_dir = input_path / "media"
+    has_metadata = any((input_path / name).exists() for name in metadata_files)
 
-    return metadata_file.exists() and media_dir.exists()
+    return has_metadata and media_dir.exists()
 
 
 def update_file_timestamps(
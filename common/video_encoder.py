@@ -364,6 +364,12 @@ class VideoEncoder:
                 "-hwaccel_output_format",
                 "vaapi",
             ]
+        if self.encoder_name == "hevc_nvenc":
+            # Decode on NVDEC as well. Without -hwaccel_output_format, decoded
+            # frames are copied back to system memory, so the CPU filters
+            # (transpose, overlay) work unchanged, and ffmpeg falls back to
+            # software decoding for codecs NVDEC can't handle
+            return ["-hwaccel", "cuda"]
         # Other encoders don't need special input args
         return []
 
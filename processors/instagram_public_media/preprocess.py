@@ -5,28 +5,133 @@ Instagram Export Preprocessor
 Organizes Instagram export files and creates cleaned metadata:
 - Parses HTML files containing post metadata
 - Copies media files to organized output directory
-- Creates metadata.json with essential information (captions, GPS, timestamps)
+- Creates metadata.jsonl (one post per line) with essential information
+  (captions, GPS, timestamps) and export_info.json with export details
 """
 
-import json
+import html
 import logging
-import shutil
+import os
+import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import sys
 import argparse
+from functools import lru_cache
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 import multiprocessing
+from common import json_utils
+from common.copy_utils import fast_copy
 from common.filter_banned_files import BannedFilesFilter
 from common.progress import PHASE_PREPROCESS, futures_progress
 from common.failure_tracker import FailureTracker
 
+try:
+    import msgpack
+
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Metadata output formats: JSON Lines, MessagePack, or both
+METADATA_FORMATS = ("json", "msgpack", "both")
+
+# Timestamp formats used by the HTML export
+TIMESTAMP_FORMAT = "%b %d, %Y %I:%M %p"  # New format: "Oct 02, 2022 5:58 pm"
+LEGACY_TIMESTAMP_FORMAT = "%b %d, %Y, %I:%M %p"  # Legacy format: "Oct 02, 2022, 5:58 PM"
+
+
+# Class attributes used by the HTML export markup
+POST_CONTAINER_CLASS = "pam _3-95 _2ph- _a6-g uiBoxWhite noborder"
+CAPTION_CLASS = "_3-95 _2pim _a6-h _a6-i"
+TIMESTAMP_CLASS = "_3-94 _a6-o"
+
+# Patterns for reading the simple text-only fields straight from the HTML.
+# They only match the plain form of each element (a single text node);
+# anything else falls back to BeautifulSoup.
+_CONTAINER_START_RE = re.compile(f'<div class="{re.escape(POST_CONTAINER_CLASS)}">')
+_CAPTION_H2_RE = re.compile(f'<h2 class="{re.escape(CAPTION_CLASS)}">([^<]*)</h2>')
+_CAPTION_DIV_RE = re.compile(f'<div class="{re.escape(CAPTION_CLASS)}">([^<]*)</div>')
+_TIMESTAMP_RE = re.compile(f'<div class="{re.escape(TIMESTAMP_CLASS)}">([^<]*)</div>')
+
+# Media references: <a href="media/..."> links and <video src="media/...">
+_MEDIA_HREF_RE = re.compile(r'<a\s(?:[^>]*\s)?href="(media/[^"]*)"')
+_MEDIA_SRC_RE = re.compile(r'<video\s(?:[^>]*\s)?src="(media/[^"]*)"')
+# Attribute forms the patterns above don't handle (single-quoted/unquoted)
+_UNQUOTED_MEDIA_ATTR_RE = re.compile(r"(?:href|src)\s*=\s*'?media/")
+
+
+def _split_containers(html_text: str) -> List[str]:
+    """
+    Split raw HTML into one chunk per post container
+
+    Each chunk runs from a container's opening tag to the next container's
+    opening tag (or the end of the document).
+    """
+    starts = [m.start() for m in _CONTAINER_START_RE.finditer(html_text)]
+    ends = starts[1:] + [len(html_text)]
+    return [html_text[start:end] for start, end in zip(starts, ends)]
+
+
+def _find_media_paths(raw_container: str) -> Optional[List[str]]:
+    """
+    Find media references in a container's raw HTML
+
+    Returns the same list as walking the parsed container (link hrefs
+    first, then video sources, each in document order), or None if the
+    container uses attribute quoting the patterns don't handle.
+    """
+    if _UNQUOTED_MEDIA_ATTR_RE.search(raw_container):
+        return None
+    media_paths = [html.unescape(m) for m in _MEDIA_HREF_RE.findall(raw_container)]
+    media_paths.extend(html.unescape(m) for m in _MEDIA_SRC_RE.findall(raw_container))
+    return media_paths
+
+
+def _parse_container(raw_container: str):
+    """Parse a single container's raw HTML and return its container element"""
+    soup = BeautifulSoup(raw_container, "html.parser")
+    return soup.find("div", class_=POST_CONTAINER_CLASS)
+
+
+def _element_text(match: "re.Match") -> str:
+    """Return matched element text the way get_text(strip=True) would"""
+    return html.unescape(match.group(1)).strip()
+
+
+@lru_cache(maxsize=1024)
+def _snake_case_label(label: str) -> str:
+    """Convert a table label to a snake_case field name
+
+    Exports use a small, fixed set of labels repeated on every post, so the
+    conversion is cached rather than redone for each row.
+    """
+    return label.lower().replace(" ", "_")
+
+
+@lru_cache(maxsize=65536)
+def _parse_timestamp_str(timestamp_str: str) -> Optional[str]:
+    """
+    Convert an HTML export timestamp string to "YYYY-MM-DD HH:MM:SS"
+
+    The two formats differ only by the comma after the year, so the right
+    one is picked up front instead of retrying strptime. Results are cached
+    because many posts share the same minute-resolution timestamp.
+
+    Returns None if the string doesn't match the expected format.
+    """
+    fmt = LEGACY_TIMESTAMP_FORMAT if timestamp_str.count(",") > 1 else TIMESTAMP_FORMAT
+    try:
+        dt = datetime.strptime(timestamp_str, fmt)
+    except ValueError:
+        return None
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
 class InstagramPreprocessor:
@@ -43,12 +148,17 @@ class InstagramPreprocessor:
         "other_content": "other",
     }
 
+    # Table labels that are not copied into additional_metadata
+    # (GPS fields are returned separately)
+    SKIPPED_TABLE_LABELS = frozenset(["Latitude", "Longitude", "Has Camera Metadata"])
+
     def __init__(
         self,
         export_path: Path,
         output_dir: Optional[Path] = None,
         workers: Optional[int] = None,
         final_output_dir: Optional[Path] = None,
+        metadata_format: str = "json",
     ):
         self.export_path = Path(export_path)
         self.media_source_dir = self.export_path / "media"
@@ -72,7 +182,10 @@ class InstagramPreprocessor:
         output_base = Path(output_dir) if output_dir else self.export_path
         self.output_dir = output_base
         self.media_output_dir = output_base / "media"
-        self.metadata_file = output_base / "metadata.json"
+        self.metadata_file = output_base / "metadata.jsonl"
+        self.export_info_file = output_base / "export_info.json"
+        self.msgpack_file = output_base / "metadata.msgpack"
+        self.metadata_format = metadata_format
         self.log_file = output_base / "preprocessing.log"
 
         # Final output directory for processor (for failure tracking)
@@ -94,10 +207,9 @@ class InstagramPreprocessor:
         else:
             self.workers = max(1, workers)
         
-        # Thread-safe locks for shared data structures
-        self.stats_lock = Lock()
+        # Thread-safe lock for log entries (statistics are only updated
+        # from the main thread)
         self.log_lock = Lock()
-        self.destination_lock = Lock()
 
         # Statistics
         self.stats = {
@@ -178,20 +290,11 @@ class InstagramPreprocessor:
           - Legacy (2022): "Oct 02, 2022, 5:58 PM" (extra comma after year)
         Output format: "2022-10-02 17:58:00"
         """
-        # Try both timestamp formats (new format first, then legacy with comma)
-        formats = [
-            "%b %d, %Y %I:%M %p",   # New format: "Oct 02, 2022 5:58 pm"
-            "%b %d, %Y, %I:%M %p",  # Legacy format: "Oct 02, 2022, 5:58 PM"
-        ]
-        
-        for fmt in formats:
-            try:
-                dt = datetime.strptime(timestamp_str, fmt)
-                return dt.strftime("%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                continue
-        
-        # If all formats fail, log the error
+        parsed = _parse_timestamp_str(timestamp_str)
+        if parsed is not None:
+            return parsed
+
+        # If the format didn't match, log the error
         self.log_message(
             "TIMESTAMP_PARSE_ERROR",
             f"Failed to parse timestamp: {timestamp_str}",
@@ -199,82 +302,65 @@ class InstagramPreprocessor:
         )
         return None
 
-    def extract_gps(self, post_element) -> Tuple[Optional[float], Optional[float]]:
+    def _extract_table_fields(
+        self, post_element
+    ) -> Tuple[Optional[float], Optional[float], Dict]:
         """
-        Extract GPS coordinates from post element
-        Returns: (latitude, longitude) or (None, None)
+        Extract GPS coordinates and additional metadata from post tables
+        in a single pass over the table rows
+
+        Each row is a label/value pair of <div class="_a6-q"> elements, so
+        the divs are looked up once per row and shared by every field.
+
+        Returns: (latitude, longitude, additional_metadata)
         """
         latitude = None
         longitude = None
+        metadata = {}
 
         try:
-            # Find all table rows
-            tables = post_element.find_all("table")
-            for table in tables:
-                rows = table.find_all("tr")
-                for row in rows:
-                    # Look for Latitude/Longitude labels
-                    label_div = row.find("div", class_="_a6-q")
-                    if label_div:
-                        label_text = label_div.get_text(strip=True)
-                        if label_text == "Latitude":
-                            # Find the value in the next div
-                            value_divs = row.find_all("div", class_="_a6-q")
-                            if len(value_divs) >= 2:
-                                try:
-                                    latitude = float(value_divs[1].get_text(strip=True))
-                                except ValueError:
-                                    pass
-                        elif label_text == "Longitude":
-                            value_divs = row.find_all("div", class_="_a6-q")
-                            if len(value_divs) >= 2:
-                                try:
-                                    longitude = float(
-                                        value_divs[1].get_text(strip=True)
-                                    )
-                                except ValueError:
-                                    pass
-        except Exception as e:
-            self.log_message("GPS_PARSE_ERROR", "Failed to extract GPS", str(e))
-
-        return latitude, longitude
+            for row in post_element.find_all("tr"):
+                value_divs = row.find_all("div", class_="_a6-q")
+                if not value_divs:
+                    continue
 
-    def extract_additional_metadata(self, post_element) -> Dict:
-        """Extract additional metadata fields from tables"""
-        metadata = {}
+                label_text = value_divs[0].get_text(strip=True)
+                if len(value_divs) < 2:
+                    continue
+                value_text = value_divs[1].get_text(strip=True)
 
-        try:
-            tables = post_element.find_all("table")
-            for table in tables:
-                rows = table.find_all("tr")
-                for row in rows:
-                    label_div = row.find("div", class_="_a6-q")
-                    if label_div:
-                        label_text = label_div.get_text(strip=True)
-                        # Skip GPS fields (handled separately)
-                        if label_text in [
-                            "Latitude",
-                            "Longitude",
-                            "Has Camera Metadata",
-                        ]:
-                            continue
-
-                        # Get value
-                        value_divs = row.find_all("div", class_="_a6-q")
-                        if len(value_divs) >= 2:
-                            value_text = value_divs[1].get_text(strip=True)
-                            if value_text:
-                                # Convert field name to snake_case
-                                field_name = label_text.lower().replace(" ", "_")
-                                metadata[field_name] = value_text
+                if label_text == "Latitude":
+                    try:
+                        latitude = float(value_text)
+                    except ValueError:
+                        pass
+                elif label_text == "Longitude":
+                    try:
+                        longitude = float(value_text)
+                    except ValueError:
+                        pass
+                elif label_text not in self.SKIPPED_TABLE_LABELS and value_text:
+                    metadata[_snake_case_label(label_text)] = value_text
         except Exception as e:
             self.log_message(
                 "METADATA_PARSE_ERROR",
-                "Failed to extract additional metadata",
+                "Failed to extract table fields",
                 str(e),
             )
 
-        return metadata
+        return latitude, longitude, metadata
+
+    def extract_gps(self, post_element) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Extract GPS coordinates from post element
+        Returns: (latitude, longitude) or (None, None)
+        """
+        latitude, longitude, _ = self._extract_table_fields(post_element)
+        return latitude, longitude
+
+    def extract_additional_metadata(self, post_element) -> Dict:
+        """Extract additional metadata fields from tables"""
+        return self._extract_table_fields(post_element)[2]
 
     def extract_media_paths(self, post_element) -> List[str]:
         """
@@ -307,6 +393,57 @@ class InstagramPreprocessor:
 
         return media_paths
 
+    def _extract_caption_and_timestamp(
+        self, container, raw_container: Optional[str]
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Extract caption and raw timestamp text from a post container
+
+        Both fields are plain text elements, so they are read with a regex
+        over the container's raw HTML when possible. The parsed container is
+        only walked when an element is present but not in its plain form
+        (container may be None, in which case it is parsed on demand).
+
+        Returns: (caption or "", timestamp string or None)
+        """
+        caption = None
+        timestamp_str = None
+        timestamp_found = False
+
+        if raw_container is not None:
+            # New format uses <h2>, legacy format uses <div> with same class
+            match = _CAPTION_H2_RE.search(raw_container)
+            if match is None and f"<h2 class=\"{CAPTION_CLASS}\"" not in raw_container:
+                match = _CAPTION_DIV_RE.search(raw_container)
+            if match is not None:
+                caption = _element_text(match)
+            elif CAPTION_CLASS not in raw_container:
+                caption = ""
+
+            match = _TIMESTAMP_RE.search(raw_container)
+            if match is not None:
+                timestamp_str = _element_text(match)
+                timestamp_found = True
+            elif TIMESTAMP_CLASS not in raw_container:
+                timestamp_found = True
+
+        if container is None and (caption is None or not timestamp_found):
+            container = _parse_container(raw_container)
+
+        if caption is None:
+            # New format uses <h2>, legacy format uses <div> with same class
+            caption_elem = container.find("h2", class_=CAPTION_CLASS)
+            if not caption_elem:
+                caption_elem = container.find("div", class_=CAPTION_CLASS)
+            caption = caption_elem.get_text(strip=True) if caption_elem else ""
+
+        if not timestamp_found:
+            timestamp_elem = container.find("div", class_=TIMESTAMP_CLASS)
+            if timestamp_elem:
+                timestamp_str = timestamp_elem.get_text(strip=True)
+
+        return caption, timestamp_str
+
     def parse_html_file(self, html_path: Path, media_type: str) -> List[Dict]:
         """
         Parse an HTML file and extract post metadata
@@ -316,48 +453,68 @@ class InstagramPreprocessor:
 
         try:
             with open(html_path, "r", encoding="utf-8") as f:
-                soup = BeautifulSoup(f, "html.parser")
-
-            # Find all post containers
-            post_containers = soup.find_all(
-                "div", class_="pam _3-95 _2ph- _a6-g uiBoxWhite noborder"
-            )
+                html_text = f.read()
+
+            # Split the raw HTML into post containers. When every container
+            # opening tag was found this way, each container is parsed on its
+            # own and only if it references media; otherwise fall back to
+            # parsing the whole document.
+            raw_containers = _split_containers(html_text)
+            if html_text.count(POST_CONTAINER_CLASS) == len(raw_containers):
+                post_containers = [None] * len(raw_containers)
+            else:
+                soup = BeautifulSoup(html_text, "html.parser")
+                post_containers = soup.find_all("div", class_=POST_CONTAINER_CLASS)
+                raw_containers = [None] * len(post_containers)
 
             print(f"   Found {len(post_containers)} posts in {html_path.name}")
 
             for idx, container in enumerate(post_containers):
+                raw_container = raw_containers[idx]
                 post_data = {"media_type": media_type}
 
-                # Extract caption (optional)
-                # New format uses <h2>, legacy format uses <div> with same class
-                caption_elem = container.find("h2", class_="_3-95 _2pim _a6-h _a6-i")
-                if not caption_elem:
-                    caption_elem = container.find("div", class_="_3-95 _2pim _a6-h _a6-i")
-                post_data["caption"] = (
-                    caption_elem.get_text(strip=True) if caption_elem else ""
+                # Extract caption (optional) and timestamp
+                caption, timestamp_str = self._extract_caption_and_timestamp(
+                    container, raw_container
                 )
+                post_data["caption"] = caption
 
-                # Extract timestamp
-                timestamp_elem = container.find("div", class_="_3-94 _a6-o")
-                if timestamp_elem:
-                    timestamp_str = timestamp_elem.get_text(strip=True)
+                if timestamp_str is not None:
                     post_data["timestamp"] = self.parse_timestamp(timestamp_str)
                     post_data["timestamp_raw"] = timestamp_str
                 else:
                     post_data["timestamp"] = None
                     post_data["timestamp_raw"] = None
 
-                # Extract media paths
-                media_paths = self.extract_media_paths(container)
-                post_data["media_paths"] = media_paths
+                if raw_container is not None and "media/" not in raw_container:
+                    # No media references, so the post produces no output
+                    # files; skip parsing its links and tables
+                    media_paths = []
+                    latitude, longitude, additional = None, None, {}
+                else:
+                    # Extract media paths, straight from the raw HTML if possible
+                    media_paths = None
+                    if raw_container is not None:
+                        media_paths = _find_media_paths(raw_container)
+                    if media_paths is None:
+                        if container is None:
+                            container = _parse_container(raw_container)
+                        media_paths = self.extract_media_paths(container)
+
+                    # Extract GPS and additional metadata (one pass over tables)
+                    if raw_container is not None and "<table" not in raw_container:
+                        latitude, longitude, additional = None, None, {}
+                    else:
+                        if container is None:
+                            container = _parse_container(raw_container)
+                        latitude, longitude, additional = self._extract_table_fields(
+                            container
+                        )
 
-                # Extract GPS
-                latitude, longitude = self.extract_gps(container)
+                post_data["media_paths"] = media_paths
                 post_data["latitude"] = latitude
                 post_data["longitude"] = longitude
 
-                # Extract additional metadata
-                additional = self.extract_additional_metadata(container)
                 if additional:
                     post_data["additional_metadata"] = additional
 
@@ -397,29 +554,45 @@ class InstagramPreprocessor:
 
         print("\nScanning media directories...")
 
-        # Recursively find all media files
-        for file_path in self.media_source_dir.rglob("*"):
-            # Skip banned directories (check all parts of path)
-            if any(
-                self.banned_filter.is_banned(part_path)
-                for part_path in file_path.parents
-            ):
-                continue
-
-            if file_path.is_file():
-                # Skip banned files
-                if self.banned_filter.is_banned(file_path):
-                    self.stats["banned_files_skipped"] += 1
-                    self.log_message(
-                        "BANNED_FILE_SKIPPED",
-                        f"Skipped banned file: {file_path.name}",
-                        f"path: {file_path.relative_to(self.media_source_dir)}",
-                    )
-                    continue
+        # Walk the tree with os.scandir, pruning banned directories as soon
+        # as they are reached instead of checking every file's ancestors
+        is_banned_name = self.banned_filter.is_banned_name
+        media_source_str = str(self.media_source_dir)
+        stack = [media_source_str]
+
+        # Directory names repeat across media types (posts/202101,
+        # reels/202101, ...), so each name's banned decision is cached
+        banned_dir_names: Dict[str, bool] = {}
+
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        name = entry.name
+                        banned = banned_dir_names.get(name)
+                        if banned is None:
+                            banned = banned_dir_names[name] = is_banned_name(name)
+                        # Skip banned directories and everything below them
+                        if not banned:
+                            stack.append(entry.path)
+                        continue
+
+                    if not entry.is_file():
+                        continue
+
+                    # Skip banned files
+                    if is_banned_name(entry.name):
+                        self.stats["banned_files_skipped"] += 1
+                        self.log_message(
+                            "BANNED_FILE_SKIPPED",
+                            f"Skipped banned file: {entry.name}",
+                            f"path: {os.path.relpath(entry.path, media_source_str)}",
+                        )
+                        continue
 
-                # Map filename to source path
-                catalog[file_path.name] = file_path
-                self.stats["total_media_files"] += 1
+                    # Map filename to source path
+                    catalog[entry.name] = Path(entry.path)
+                    self.stats["total_media_files"] += 1
 
         logger.info(f"   Found {len(catalog)} media files")
 
@@ -434,32 +607,70 @@ class InstagramPreprocessor:
 
         print("\nCopying media files...")
 
-        matched_files = set()
+        needed: Dict[str, List[Tuple[List, int]]] = {}
+        future_to_filename: Dict = {}
 
-        for post in metadata:
-            media_paths = post.get("media_paths", [])
-            copied_files = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self._submit_media_copies(
+                metadata, file_catalog, needed, executor, future_to_filename
+            )
+            self._collect_media_copies(
+                metadata, file_catalog, needed, future_to_filename
+            )
 
-            for media_path in media_paths:
-                # Extract filename from path
-                filename = Path(media_path).name
+    def _submit_media_copies(
+        self,
+        posts: List[Dict],
+        file_catalog: Dict[str, Path],
+        needed: Dict[str, List[Tuple[List, int]]],
+        executor: ThreadPoolExecutor,
+        future_to_filename: Dict,
+    ) -> None:
+        """
+        Record the media references of posts and start copying new files
 
-                if filename in file_catalog:
-                    source_path = file_catalog[filename]
-                    dest_path = self.media_output_dir / filename
+        References are grouped per file in needed, so each file is copied
+        once no matter how many posts (carousels, reposts) reference it.
+        Each reference is a slot in its post's media_files list, keeping HTML
+        order. Can be called repeatedly with the same needed/future_to_filename
+        as batches of posts become available.
 
-                    try:
-                        shutil.copy2(source_path, dest_path)
-                        copied_files.append(filename)
-                        matched_files.add(filename)
-                        self.stats["media_copied"] += 1
-                    except Exception as e:
-                        self.log_message(
-                            "COPY_ERROR",
-                            f"Failed to copy {filename}",
-                            str(e),
-                        )
-                        print(f"ERROR: Failed to copy {filename}: {e}")
+        Args:
+            posts: Posts whose media_paths should be copied
+            file_catalog: Mapping of filename -> source path
+            needed: filename -> [(post_files, index)], updated in place
+            executor: Executor that runs the copies
+            future_to_filename: future -> filename, updated in place
+        """
+        # Hoisted out of the per-reference loop, which can run hundreds of
+        # thousands of times; plain string operations avoid Path objects
+        catalog_get = file_catalog.get
+        media_out_str = os.path.join(str(self.media_output_dir), "")
+
+        for post in posts:
+            # Remove media_paths as it's no longer needed
+            media_paths = post.pop("media_paths", [])
+            post_files = [None] * len(media_paths)
+            # Update post with just filenames (not full paths)
+            post["media_files"] = post_files
+
+            for idx, media_path in enumerate(media_paths):
+                # Extract filename from path (HTML paths always use "/")
+                filename = media_path.rpartition("/")[2]
+
+                if filename in needed:
+                    needed[filename].append((post_files, idx))
+                    continue
+
+                source_path = catalog_get(filename)
+                if source_path is not None:
+                    needed[filename] = [(post_files, idx)]
+                    # Hard links are safe here: the processor copies these
+                    # files again before modifying them
+                    future = executor.submit(
+                        fast_copy, source_path, media_out_str + filename, True
+                    )
+                    future_to_filename[future] = filename
                 else:
                     self.log_message(
                         "MISSING_FILE",
@@ -482,10 +693,42 @@ class InstagramPreprocessor:
                         },
                     )
 
-            # Update post with just filenames (not full paths)
-            post["media_files"] = copied_files
-            # Remove media_paths as it's no longer needed
-            del post["media_paths"]
+    def _collect_media_copies(
+        self,
+        metadata: List[Dict],
+        file_catalog: Dict[str, Path],
+        needed: Dict[str, List[Tuple[List, int]]],
+        future_to_filename: Dict,
+    ) -> None:
+        """
+        Wait for submitted copies, fill in media_files and report orphans
+
+        Results are applied from the calling thread only, so no locking is
+        needed.
+        """
+        matched_files = set()
+
+        for future in as_completed(future_to_filename):
+            filename = future_to_filename[future]
+            try:
+                future.result()
+            except Exception as e:
+                self.log_message(
+                    "COPY_ERROR",
+                    f"Failed to copy {filename}",
+                    str(e),
+                )
+                print(f"ERROR: Failed to copy {filename}: {e}")
+                continue
+
+            matched_files.add(filename)
+            for post_files, idx in needed[filename]:
+                post_files[idx] = filename
+                self.stats["media_copied"] += 1
+
+        # Drop slots for files that failed to copy
+        for post in metadata:
+            post["media_files"] = [f for f in post["media_files"] if f is not None]
 
         # Report orphaned files (in filesystem but not referenced in HTML)
         orphaned = set(file_catalog.keys()) - matched_files
@@ -509,44 +752,47 @@ class InstagramPreprocessor:
         print(f"   Missing files: {self.stats['missing_files']}")
         print(f"   Orphaned files: {self.stats['orphaned_files']}")
 
-    def _process_single_html_file(self, html_tuple: Tuple[str, str]) -> Tuple[str, List[Dict]]:
+    def _process_single_html_file(
+        self, html_tuple: Tuple[str, str]
+    ) -> Tuple[str, List[Dict], Optional[Dict[str, int]]]:
         """
         Process a single HTML file (used by multithreaded processing)
+
+        Statistics are returned rather than written to self.stats so that
+        worker threads never contend on a shared lock; the caller merges
+        them from the main thread.
         
         Args:
             html_tuple: Tuple of (html_basename, media_type)
             
         Returns:
-            Tuple of (media_type, list of posts)
+            Tuple of (media_type, list of posts, type statistics), where the
+            statistics are None if the HTML file doesn't exist
         """
         html_basename, media_type = html_tuple
         html_path = self.html_dir / f"{html_basename}.html"
 
         if not html_path.exists():
-            return (media_type, [])
+            return (media_type, [], None)
 
         posts = self.parse_html_file(html_path, media_type)
 
-        # Update statistics
-        with self.stats_lock:
-            if media_type not in self.stats["by_type"]:
-                self.stats["by_type"][media_type] = {"posts": 0, "media_files": 0}
-
-            self.stats["by_type"][media_type]["posts"] = len(posts)
-            for post in posts:
-                self.stats["by_type"][media_type]["media_files"] += len(
-                    post.get("media_paths", [])
-                )
+        type_stats = {
+            "posts": len(posts),
+            "media_files": sum(len(post.get("media_paths", [])) for post in posts),
+        }
 
-        return (media_type, posts)
+        return (media_type, posts, type_stats)
 
-    def create_metadata(self, file_catalog: Dict[str, Path]) -> List[Dict]:
-        """
-        Main processing: parse all HTML files and create metadata
-        Returns list of all posts with metadata (multithreaded)
+    def iter_html_results(self):
         """
-        all_posts = []
+        Parse all HTML files in parallel, yielding posts as each file finishes
+
+        Type statistics are merged here, in the consuming thread.
 
+        Yields:
+            Tuple of (media_type, list of posts) per successfully parsed file
+        """
         print(f"\nProcessing HTML files (using {self.workers} workers)...")
 
         html_files = list(self.MEDIA_TYPES.items())
@@ -563,10 +809,13 @@ class InstagramPreprocessor:
             for future in futures_progress(future_to_html, PHASE_PREPROCESS, "Parsing HTML files", unit="file"):
                 html_basename = future_to_html[future]
                 try:
-                    media_type, posts = future.result()
-                    if posts:
-                        print(f"   Processed {html_basename}.html: {len(posts)} posts")
-                        all_posts.extend(posts)
+                    media_type, posts, type_stats = future.result()
+                    if type_stats is not None:
+                        by_type = self.stats["by_type"].setdefault(
+                            media_type, {"posts": 0, "media_files": 0}
+                        )
+                        by_type["posts"] += type_stats["posts"]
+                        by_type["media_files"] += type_stats["media_files"]
                 except Exception as e:
                     self.log_message(
                         "HTML_PROCESSING_ERROR",
@@ -574,31 +823,114 @@ class InstagramPreprocessor:
                         str(e),
                     )
                     logger.error(f"Failed to process {html_basename}.html: {e}")
+                    continue
+
+                if posts:
+                    print(f"   Processed {html_basename}.html: {len(posts)} posts")
+                yield media_type, posts
+
+    def create_metadata(self, file_catalog: Dict[str, Path]) -> List[Dict]:
+        """
+        Main processing: parse all HTML files and create metadata
+        Returns list of all posts with metadata (multithreaded)
+        """
+        all_posts = []
+        for _, posts in self.iter_html_results():
+            all_posts.extend(posts)
+
+        self.stats["total_posts"] = len(all_posts)
+
+        return all_posts
+
+    def create_metadata_and_copy(self, file_catalog: Dict[str, Path]) -> List[Dict]:
+        """
+        Parse HTML files and copy their media, overlapping the two phases
+
+        Copies for a file's posts are submitted as soon as that HTML file is
+        parsed, so I/O-bound copying runs while the remaining files are
+        still being parsed. Equivalent to create_metadata() followed by
+        copy_media_files().
+
+        Returns:
+            List of all posts with media_files filled in
+        """
+        self.media_output_dir.mkdir(parents=True, exist_ok=True)
+
+        all_posts = []
+        needed: Dict[str, List[Tuple[List, int]]] = {}
+        future_to_filename: Dict = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as copy_executor:
+            for _, posts in self.iter_html_results():
+                all_posts.extend(posts)
+                self._submit_media_copies(
+                    posts, file_catalog, needed, copy_executor, future_to_filename
+                )
 
-        with self.stats_lock:
             self.stats["total_posts"] = len(all_posts)
 
+            print("\nCopying media files...")
+            self._collect_media_copies(
+                all_posts, file_catalog, needed, future_to_filename
+            )
+
         return all_posts
 
     def save_metadata(self, metadata: List[Dict]) -> None:
-        """Save cleaned metadata to metadata.json"""
+        """
+        Save cleaned metadata as JSON Lines and/or MessagePack
+
+        Each post is written to metadata.jsonl on its own line, so neither
+        this method nor the processor needs the whole document in memory.
+        With the "msgpack" or "both" format, posts are also (or instead)
+        written to metadata.msgpack as a stream of MessagePack objects.
+        Export details go to a separate export_info.json. Metadata files in
+        a format not written this run are removed, so a leftover from an
+        earlier run can't be read in place of the new metadata.
+        """
+        write_json = self.metadata_format in ("json", "both")
+        write_msgpack = self.metadata_format in ("msgpack", "both")
+        if write_msgpack and not HAS_MSGPACK:
+            logger.warning("msgpack is not installed; writing metadata.jsonl instead")
+            write_json, write_msgpack = True, False
+
         try:
             # Add export info
-            output = {
-                "export_info": {
-                    "export_path": str(self.export_path),
-                    "export_name": self.export_path.name,
-                    "processed_date": datetime.now().isoformat(),
-                    "total_posts": self.stats["total_posts"],
-                    "total_media_files": self.stats["media_copied"],
-                },
-                "media": metadata,
+            export_info = {
+                "export_path": str(self.export_path),
+                "export_name": self.export_path.name,
+                "processed_date": datetime.now().isoformat(),
+                "total_posts": self.stats["total_posts"],
+                "total_media_files": self.stats["media_copied"],
             }
 
-            with open(self.metadata_file, "w", encoding="utf-8") as f:
-                json.dump(output, f, indent=2, ensure_ascii=False)
+            with open(self.export_info_file, "wb") as f:
+                f.write(json_utils.dumps(export_info, indent=True))
 
-            print(f"\nSUCCESS: Saved metadata to {self.metadata_file}")
+            stale_files = [self.output_dir / "metadata.json"]
+            if not write_json:
+                stale_files.append(self.metadata_file)
+            if not write_msgpack:
+                stale_files.append(self.msgpack_file)
+            for stale_file in stale_files:
+                try:
+                    stale_file.unlink()
+                except FileNotFoundError:
+                    pass
+
+            if write_json:
+                with open(self.metadata_file, "wb") as f:
+                    for post in metadata:
+                        f.write(json_utils.dumps(post))
+                        f.write(b"\n")
+                print(f"\nSUCCESS: Saved metadata to {self.metadata_file}")
+
+            if write_msgpack:
+                packer = msgpack.Packer(use_bin_type=True)
+                with open(self.msgpack_file, "wb") as f:
+                    for post in metadata:
+                        f.write(packer.pack(post))
+                print(f"\nSUCCESS: Saved metadata to {self.msgpack_file}")
         except Exception as e:
             logger.error(f"Failed to save metadata: {e}")
             sys.exit(1)
@@ -635,11 +967,8 @@ class InstagramPreprocessor:
         # Build file catalog
         file_catalog = self.build_file_catalog()
 
-        # Create metadata by parsing HTML files
-        metadata = self.create_metadata(file_catalog)
-
-        # Copy media files to output directory
-        self.copy_media_files(metadata, file_catalog)
+        # Parse HTML files, copying each file's media as soon as it's parsed
+        metadata = self.create_metadata_and_copy(file_catalog)
 
         # Save metadata
         self.save_metadata(metadata)
@@ -671,6 +1000,9 @@ Examples:
   
   # Process with custom number of workers
   python preprocess_files.py instagram-username-2025-10-07 --workers 8
+
+  # Also write metadata.msgpack (requires: pip install msgpack)
+  python preprocess_files.py instagram-username-2025-10-07 --format both
         """,
     )
 
@@ -696,12 +1028,30 @@ Examples:
         help="Number of parallel workers (default: CPU count - 1)",
     )
 
+    parser.add_argument(
+        "--format",
+        choices=METADATA_FORMATS,
+        default="json",
+        help=(
+            "Metadata output format: json writes metadata.jsonl, msgpack writes "
+            "metadata.msgpack, both writes both; metadata files from other formats "
+            "are removed, and the processor reads metadata.msgpack first when "
+            "present (default: json, i.e. metadata.jsonl)"
+        ),
+    )
+
     args = parser.parse_args()
 
+    if args.format != "json" and not HAS_MSGPACK:
+        print("ERROR: msgpack is required for --format msgpack/both. Install it with: pip install msgpack")
+        sys.exit(1)
+
     export_path = Path(args.export_directory)
     output_path = Path(args.output) if args.output else None
 
-    preprocessor = InstagramPreprocessor(export_path, output_path, workers=args.workers)
+    preprocessor = InstagramPreprocessor(
+        export_path, output_path, workers=args.workers, metadata_format=args.format
+    )
     preprocessor.process()
 
 
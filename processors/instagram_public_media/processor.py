@@ -4,45 +4,86 @@ Instagram Media Processor
 This processor is designed to be used through memoria.py.
 It handles renaming Instagram media files, embedding metadata, and updating filesystem timestamps.
 """
-import json
 import logging
 import multiprocessing
 import os
 import re
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from multiprocessing import shared_memory
 from pathlib import Path
 from typing import Optional
 
+from common import json_utils
+from common.copy_utils import fast_copy
 from common.dependency_checker import check_exiftool, print_exiftool_error
 from common.exiftool_batch import (
     batch_validate_exif,
     batch_rebuild_exif,
     batch_read_existing_metadata,
     batch_write_metadata_instagram_public,
+    start_exiftool_session,
 )
 from common.processing import (
     print_processing_summary,
     temp_processing_directory,
 )
-from common.progress import PHASE_PROCESS, progress_bar
+from common.progress import PHASE_PROCESS, counter_progress
 from common.utils import (
     extract_username_from_export_dir,
     is_preprocessed_directory,
-    update_file_timestamps,
 )
 from processors.base import ProcessorBase
 from processors.instagram_public_media.preprocess import InstagramPreprocessor
 
+try:
+    import msgpack
+
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Metadata files the preprocessor writes (metadata.json from older versions)
+PREPROCESSED_METADATA_FILES = ("metadata.jsonl", "metadata.msgpack", "metadata.json")
+
+# Media batch sizing: aim for this many batches per worker, clamped to
+# [MIN_BATCH_SIZE, MAX_BATCH_SIZE] files (exiftool helpers chunk at 500)
+BATCHES_PER_WORKER = 4
+MIN_BATCH_SIZE = 16
+MAX_BATCH_SIZE = 200
+
+# Batches a pool worker processes before it is replaced
+WORKER_MAX_TASKS = 16
+
+# Threads each worker uses to overlap its batch's copies (I/O bound, so the
+# GIL is released while they wait on the filesystem)
+COPY_THREADS_PER_WORKER = 4
+
+# Date-organized media folders are named YYYYMM
+_DATE_FOLDER_RE = re.compile(r"^\d{6}$")
+
 
 # ============================================================================
 # Processor Detection and Registration (for unified memoria.py)
 # ============================================================================
 
 
+def _has_date_folder(directory: Path) -> bool:
+    """Check whether a directory contains at least one YYYYMM subfolder
+
+    Uses os.scandir so entry types come from the directory listing itself
+    instead of a stat call per entry, and stops at the first match.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if _DATE_FOLDER_RE.match(entry.name) and entry.is_dir():
+                return True
+    return False
+
+
 def detect(input_path: Path) -> bool:
     """Check if this processor can handle the input directory
 
@@ -73,27 +114,11 @@ def detect(input_path: Path) -> bool:
             return False
 
         # Verify date-organized structure (YYYYMM folders)
-        date_folder_pattern = re.compile(r"^\d{6}$")  # YYYYMM format
-
-        # Check posts directory for date folders
-        if has_posts:
-            date_folders = [
-                d
-                for d in posts_dir.iterdir()
-                if d.is_dir() and date_folder_pattern.match(d.name)
-            ]
-            if len(date_folders) > 0:
-                return True
+        if has_posts and _has_date_folder(posts_dir):
+            return True
 
-        # Check archived_posts directory for date folders
-        if has_archived:
-            date_folders = [
-                d
-                for d in archived_posts_dir.iterdir()
-                if d.is_dir() and date_folder_pattern.match(d.name)
-            ]
-            if len(date_folders) > 0:
-                return True
+        if has_archived and _has_date_folder(archived_posts_dir):
+            return True
 
         return False
 
@@ -177,7 +202,7 @@ def get_processor():
 
 
 def generate_unique_filename(
-    post_data, media_type, export_username, extension, used_filenames
+    post_data, media_type, export_username, extension, counters
 ):
     """Generate a unique filename for a processed media file
 
@@ -189,7 +214,8 @@ def generate_unique_filename(
         media_type: Type of media (posts, archived_posts, etc.)
         export_username: Username extracted from input directory
         extension: File extension (including the dot)
-        used_filenames: Set tracking already-used filenames
+        counters: Dict mapping (media_type, date_key, extension) to the
+                  number of filenames already generated for that key
 
     Returns:
         str: Generated filename
@@ -202,72 +228,187 @@ def generate_unique_filename(
     if date_str is None:
         # Use a fallback date for posts without timestamps
         date_key = "00000000"
+    elif len(date_str) == 19 and date_str[4] == "-" and date_str[7] == "-":
+        # Preprocessed timestamps are always in this fixed format, so the
+        # date key can be sliced out without a strptime/strftime round trip
+        date_key = date_str[0:4] + date_str[5:7] + date_str[8:10]
     else:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-        date_key = date_obj.strftime("%Y%m%d")
+        date_key = datetime.fromisoformat(date_str).strftime("%Y%m%d")
+
+    # Every name for a key is generated here in sequence, so the next free
+    # sequence number is simply the count so far
+    key = (media_type, date_key, extension)
+    sequence = counters.get(key, 0)
+    counters[key] = sequence + 1
+
+    suffix = f"_{sequence}" if sequence else ""
+    return f"insta-{media_type}-{export_username}-{date_key}{suffix}{extension}"
+
+
+def _timestamp_ns(timestamp_str):
+    """Convert a post timestamp to nanoseconds since the epoch (local time)
+
+    Matches update_file_timestamps() for "%Y-%m-%d %H:%M:%S" strings, parsed
+    with datetime.fromisoformat (several times faster than strptime).
+
+    Args:
+        timestamp_str: Timestamp like "2025-08-17 11:23:00", or None
+
+    Returns:
+        int nanoseconds, or None if the timestamp is missing or invalid
+    """
+    if not timestamp_str:
+        return None
+    try:
+        date_obj = datetime.fromisoformat(timestamp_str)
+    except ValueError as e:
+        logger.warning(f"Failed to parse timestamp {timestamp_str!r}: {e}")
+        return None
+    return int(date_obj.timestamp()) * 1_000_000_000
+
+
+def _iter_metadata_lines(metadata_file):
+    """Yield posts from a metadata.jsonl file one line at a time
+
+    Args:
+        metadata_file: Path to metadata.jsonl written by the preprocessor
+
+    Yields:
+        Post dicts in file order
+    """
+    with open(metadata_file, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield json_utils.loads(line)
+
+
+def _iter_metadata_msgpack(msgpack_file):
+    """Yield posts from a metadata.msgpack stream one object at a time
+
+    Args:
+        msgpack_file: Path to metadata.msgpack written by the preprocessor
+
+    Yields:
+        Post dicts in file order
+    """
+    with open(msgpack_file, "rb") as f:
+        yield from msgpack.Unpacker(f, raw=False)
+
 
-    # Generate base filename without sequence number
-    base_filename = f"insta-{media_type}-{export_username}-{date_key}{extension}"
+# Per-worker state, set once per pool worker by _init_media_worker
+_worker_posts = None
+_worker_export_username = None
+_worker_media_dir = None
+_worker_output_dir = None
+# media_type -> output subdirectory with a trailing separator, filled lazily
+_worker_media_type_dirs = {}
 
-    # Check if base filename is already used
-    if base_filename not in used_filenames:
-        used_filenames.add(base_filename)
-        return base_filename
 
-    # If duplicate, find the next available sequence number
-    sequence = 1
-    while True:
-        filename = (
-            f"insta-{media_type}-{export_username}-{date_key}_{sequence}{extension}"
-        )
-        if filename not in used_filenames:
-            used_filenames.add(filename)
-            return filename
-        sequence += 1
+def _init_media_worker(shm_name, size, export_username, media_dir, output_dir):
+    """Load the shared post list into a pool worker (Pool initializer)
+
+    Posts are serialized once into a shared memory block by the parent, so
+    tasks only carry an index into this list instead of a pickled post.
+    Values shared by every task (username and base directories) are also
+    set here once, so tasks only carry relative paths.
+    Each worker also keeps one exiftool process open for all its batches.
+
+    Args:
+        shm_name: Name of the SharedMemory block holding the JSON post list
+        size: Number of bytes of JSON in the block
+        export_username: Username used for every file in this run
+        media_dir: Directory that task media files are relative to
+        output_dir: Output directory that task output paths are relative to
+    """
+    global _worker_posts, _worker_export_username
+    global _worker_media_dir, _worker_output_dir, _worker_media_type_dirs
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        _worker_posts = json_utils.loads(bytes(shm.buf[:size]))
+    finally:
+        shm.close()
+    _worker_export_username = export_username
+    # Stored with trailing separators so per-file paths are a concatenation
+    _worker_media_dir = os.path.join(media_dir, "")
+    _worker_output_dir = output_dir
+    _worker_media_type_dirs = {}
+
+    start_exiftool_session(lazy=True)
+
+
+def _copy_media_file(media_path, output_path):
+    """Copy one media file for process_media_batch, logging failures
+
+    Args:
+        media_path: Source file in the media directory
+        output_path: Destination file
+
+    Returns:
+        True if the file was copied, False otherwise
+    """
+    try:
+        # A real copy, not a link: exiftool rewrites the output in place
+        fast_copy(media_path, output_path)
+    except FileNotFoundError:
+        logger.warning(f"Media file not found: {media_path}")
+        return False
+    except Exception as e:
+        logger.error(f"Failed to copy {os.path.basename(media_path)}: {e}")
+        return False
+    return True
 
 
 def process_media_batch(batch_args):
     """Process a batch of media files (worker function for multiprocessing)
     
+    Must run in a worker initialized by _init_media_worker.
+    
     Args:
-        batch_args: List of tuples, each containing (media_file, post_data, 
-                    output_filename, media_dir, output_dir, export_username, media_type)
+        batch_args: List of tuples, each containing (post_index, media_file,
+                    output_filename, media_type, timestamp_ns), with
+                    media_file relative to the media directory and the
+                    output file placed in the media type's subdirectory
     
     Returns:
-        List of (success, failed, exif_rebuilt) tuples
+        Tuple of (success, failed, exif_rebuilt) file counts for the batch
     """
+    posts = _worker_posts
+    export_username = _worker_export_username
+    media_dir = _worker_media_dir
+    media_type_dirs = _worker_media_type_dirs
+
     # Phase 1: Copy all files
     file_paths = []
     file_info = []
+    file_timestamps = []
     
-    for args_tuple in batch_args:
-        (
-            media_file,
-            post_data,
-            output_filename,
-            media_dir,
-            output_dir,
-            export_username,
-            media_type,
-        ) = args_tuple
-        
-        media_path = os.path.join(media_dir, media_file)
-        media_type_dir = os.path.join(output_dir, media_type)
-        output_path = os.path.join(media_type_dir, output_filename)
-        
-        if not os.path.exists(media_path):
-            logger.warning(f"Media file not found: {media_path}")
+    # A missing source surfaces as FileNotFoundError from the copy itself,
+    # with no separate existence check.
+    media_paths = []
+    output_paths = []
+    for task in batch_args:
+        media_type = task[3]
+        media_type_dir = media_type_dirs.get(media_type)
+        if media_type_dir is None:
+            media_type_dir = media_type_dirs[media_type] = os.path.join(
+                _worker_output_dir, media_type, ""
+            )
+        media_paths.append(media_dir + task[1])
+        output_paths.append(media_type_dir + task[2])
+    with ThreadPoolExecutor(max_workers=COPY_THREADS_PER_WORKER) as executor:
+        copied = list(executor.map(_copy_media_file, media_paths, output_paths))
+
+    for task, output_path, ok in zip(batch_args, output_paths, copied):
+        if not ok:
             continue
-        
-        try:
-            shutil.copy2(media_path, output_path)
-            file_paths.append(output_path)
-            file_info.append((output_path, post_data, export_username, media_type))
-        except Exception as e:
-            logger.error(f"Failed to copy {media_file}: {e}")
+        post_index, _, _, media_type, timestamp_ns = task
+        file_paths.append(output_path)
+        file_info.append((output_path, posts[post_index], export_username, media_type))
+        file_timestamps.append(timestamp_ns)
     
     if not file_paths:
-        return [(False, True, False)] * len(batch_args)
+        return (0, len(batch_args), 0)
     
     # Phase 2: Batch validate and rebuild
     corrupted_files = batch_validate_exif(file_paths)
@@ -278,18 +419,26 @@ def process_media_batch(batch_args):
     existing_metadata_map = batch_read_existing_metadata(file_paths)
     batch_write_metadata_instagram_public(file_info, existing_metadata_map)
     
-    # Phase 4: Update timestamps and compile results
-    results = []
-    for output_path, post_data, _, _ in file_info:
-        update_file_timestamps(output_path, post_data.get("timestamp"))
-        exif_rebuilt = output_path in corrupted_files
-        results.append((True, False, exif_rebuilt))
-    
-    # Add failed results for files that didn't get copied
-    while len(results) < len(batch_args):
-        results.append((False, True, False))
-    
-    return results
+    # Phase 4: Update timestamps, oldest first so inode updates reach the
+    # filesystem in a steady order
+    dated_files = sorted(
+        (
+            (timestamp_ns, output_path)
+            for output_path, timestamp_ns in zip(file_paths, file_timestamps)
+            if timestamp_ns is not None
+        ),
+        key=lambda item: item[0],
+    )
+    for timestamp_ns, output_path in dated_files:
+        try:
+            os.utime(output_path, ns=(timestamp_ns, timestamp_ns))
+        except OSError as e:
+            logger.warning(f"Failed to update timestamps for {output_path}: {e}")
+
+    # Only counts are returned, keeping the result sent back to the parent small
+    success = len(file_paths)
+    exif_rebuilt = sum(1 for output_path in file_paths if output_path in corrupted_files)
+    return (success, len(batch_args) - success, exif_rebuilt)
 
 
 def process_logic(
@@ -316,7 +465,7 @@ def process_logic(
     logger.info("=" * 50)
 
     # Check if input is already preprocessed
-    if is_preprocessed_directory(input_dir):
+    if is_preprocessed_directory(input_dir, PREPROCESSED_METADATA_FILES):
         logger.info(f"Input directory is already preprocessed: {input_dir}")
         _process_working_directory(input_dir, output_dir, workers)
     else:
@@ -345,16 +494,26 @@ def _process_working_directory(working_dir, output_dir, workers):
     """Process a working directory (preprocessed export)
 
     Args:
-        working_dir: Path to preprocessed directory with metadata.json and media/
+        working_dir: Path to preprocessed directory with metadata.jsonl
+            and/or metadata.msgpack (or metadata.json from older versions)
+            and media/
         output_dir: Output directory for processed files
         workers: Number of parallel workers
     """
     # Configuration
-    metadata_file = os.path.join(working_dir, "metadata.json")
+    msgpack_file = os.path.join(working_dir, "metadata.msgpack")
+    metadata_file = os.path.join(working_dir, "metadata.jsonl")
+    export_info_file = os.path.join(working_dir, "export_info.json")
+    legacy_metadata_file = os.path.join(working_dir, "metadata.json")
     media_dir = os.path.join(working_dir, "media")
 
     # Check for metadata file (should exist after preprocessing or if already preprocessed)
-    if not os.path.exists(metadata_file):
+    use_msgpack = HAS_MSGPACK and os.path.exists(msgpack_file)
+    if (
+        not use_msgpack
+        and not os.path.exists(metadata_file)
+        and not os.path.exists(legacy_metadata_file)
+    ):
         logger.error(f"Metadata file not found: {metadata_file}")
         return
 
@@ -363,15 +522,30 @@ def _process_working_directory(working_dir, output_dir, workers):
         logger.error(f"Media directory not found: {media_dir}")
         return
 
-    # Load metadata
-    logger.info(f"Loading metadata from {metadata_file}...")
-    with open(metadata_file, "r", encoding="utf-8") as f:
-        metadata_json = json.load(f)
-
-    export_info = metadata_json.get("export_info", {})
-    media_posts = metadata_json.get("media", [])
-
-    logger.info(f"Found {len(media_posts)} posts to process")
+    # Load metadata (MessagePack when available, else JSON Lines)
+    if use_msgpack or os.path.exists(metadata_file):
+        export_info = {}
+        if os.path.exists(export_info_file):
+            with open(export_info_file, "rb") as f:
+                export_info = json_utils.loads(f.read())
+        if use_msgpack:
+            logger.info(f"Loading metadata from {msgpack_file}...")
+            media_posts = _iter_metadata_msgpack(msgpack_file)
+        else:
+            logger.info(f"Loading metadata from {metadata_file}...")
+            media_posts = _iter_metadata_lines(metadata_file)
+    else:
+        # Directories preprocessed before metadata.jsonl was introduced
+        logger.info(f"Loading metadata from {legacy_metadata_file}...")
+        if json_utils.HAS_IJSON:
+            # Stream posts instead of building the whole document in memory
+            export_info = json_utils.load_key(legacy_metadata_file, "export_info", {})
+            media_posts = json_utils.iter_array(legacy_metadata_file, "media")
+        else:
+            with open(legacy_metadata_file, "rb") as f:
+                metadata_json = json_utils.loads(f.read())
+            export_info = metadata_json.get("export_info", {})
+            media_posts = metadata_json.get("media", [])
 
     # Extract export username from export_info
     export_name = export_info.get("export_name", "")
@@ -391,45 +565,51 @@ def _process_working_directory(working_dir, output_dir, workers):
     num_workers = workers if workers is not None else default_worker_count()
     logger.debug(f"Using {num_workers} parallel workers")
 
-    # Pre-generate all output filenames to avoid race conditions
+    # Pre-generate all output filenames to avoid race conditions. Output
+    # subdirectories are created on first sight of each media type, before
+    # the pool starts, so workers can rely on them existing.
     logger.debug("Pre-generating filenames...")
-    used_filenames = set()
+    filename_counters = {}
     processing_tasks = []
-    media_types_set = set()
+    task_posts = []  # Posts referenced by tasks, shared with workers
+    media_type_dirs = set()
+    post_count = 0
 
     for post in media_posts:
+        post_count += 1
         media_type = post.get("media_type", "unknown")
         media_files = post.get("media_files", [])
-        media_types_set.add(media_type)
+
+        if media_type not in media_type_dirs:
+            media_type_dir = os.path.join(output_dir, media_type)
+            os.makedirs(media_type_dir, exist_ok=True)
+            logger.debug(f"Created directory: {media_type_dir}")
+            media_type_dirs.add(media_type)
+
+        if media_files:
+            post_index = len(task_posts)
+            task_posts.append(post)
+            # Parsed once per post and shared by all of its files
+            timestamp_ns = _timestamp_ns(post.get("timestamp"))
 
         for media_file in media_files:
-            # Get file extension
-            file_ext = os.path.splitext(media_file)[1].lower()
+            # Get file extension. media_files are bare filenames, so it runs
+            # from the last dot (a leading dot marks a hidden file instead)
+            dot = media_file.rfind(".")
+            file_ext = media_file[dot:].lower() if dot > 0 else ""
 
             # Generate output filename
             output_filename = generate_unique_filename(
-                post, media_type, export_username, file_ext, used_filenames
+                post, media_type, export_username, file_ext, filename_counters
             )
 
-            # Create task tuple for worker
+            # Create task tuple for worker; base directories are sent once
+            # per worker by _init_media_worker
             processing_tasks.append(
-                (
-                    media_file,
-                    post,
-                    output_filename,
-                    media_dir,
-                    output_dir,
-                    export_username,
-                    media_type,
-                )
+                (post_index, media_file, output_filename, media_type, timestamp_ns)
             )
 
-    # Create subdirectories for each media type
-    logger.debug(f"Creating subdirectories for {len(media_types_set)} media types...")
-    for media_type in media_types_set:
-        media_type_dir = os.path.join(output_dir, media_type)
-        Path(media_type_dir).mkdir(parents=True, exist_ok=True)
-        logger.debug(f"Created directory: {media_type_dir}")
+    logger.info(f"Found {post_count} posts to process")
 
     # Process media files in parallel
     print(f"\nProcessing media files to {output_dir}/")
@@ -439,36 +619,56 @@ def _process_working_directory(working_dir, output_dir, workers):
     failed_count = 0
     exif_rebuilt_count = 0
 
-    # Group tasks into batches of 100 files each
-    batch_size = 100
+    # Size batches so there are about BATCHES_PER_WORKER per worker, to keep
+    # every worker busy until the end, within bounds that keep exiftool
+    # calls efficient and IPC overhead low
+    batch_size = max(
+        MIN_BATCH_SIZE,
+        min(MAX_BATCH_SIZE, len(processing_tasks) // (num_workers * BATCHES_PER_WORKER)),
+    )
+    logger.debug(f"Using batches of {batch_size} files")
     batched_tasks = []
     for i in range(0, len(processing_tasks), batch_size):
         batched_tasks.append(processing_tasks[i : i + batch_size])
 
-    # Process batches in parallel
-    with multiprocessing.Pool(processes=num_workers) as pool:
-        batch_results = list(
-            progress_bar(
-                pool.imap(process_media_batch, batched_tasks),
-                PHASE_PROCESS,
-                "Creating files",
-                total=len(batched_tasks),
-            )
-        )
-
-    # Flatten results
-    results = []
-    for batch_result in batch_results:
-        results.extend(batch_result)
-
-    # Aggregate results
-    for success, failed, exif_rebuilt in results:
-        if success:
-            success_count += 1
-        if failed:
-            failed_count += 1
-        if exif_rebuilt:
-            exif_rebuilt_count += 1
+    # Share the posts with workers through one shared memory block, loaded
+    # once per worker, so tasks only pickle a post index and two file names
+    posts_blob = json_utils.dumps(task_posts)
+    posts_size = len(posts_blob)
+    posts_shm = shared_memory.SharedMemory(create=True, size=max(posts_size, 1))
+    posts_shm.buf[:posts_size] = posts_blob
+    del posts_blob, task_posts
+
+    # Process batches in parallel. Batches are independent and only their
+    # counts are needed, so results are consumed in completion order rather
+    # than waiting on the slowest earlier batch. Workers are recycled
+    # periodically to release memory built up by long runs.
+    try:
+        with multiprocessing.Pool(
+            processes=num_workers,
+            initializer=_init_media_worker,
+            initargs=(posts_shm.name, posts_size, export_username, media_dir, output_dir),
+            maxtasksperchild=WORKER_MAX_TASKS,
+        ) as pool:
+            with counter_progress(
+                len(processing_tasks), PHASE_PROCESS, "Creating files"
+            ) as progress:
+                for success, failed, exif_rebuilt in pool.imap_unordered(
+                    process_media_batch, batched_tasks, chunksize=1
+                ):
+                    # Aggregate results
+                    success_count += success
+                    failed_count += failed
+                    exif_rebuilt_count += exif_rebuilt
+                    progress.update(success + failed)
+
+            # Let workers exit normally so their exiftool processes are
+            # closed, rather than being terminated by the context manager
+            pool.close()
+            pool.join()
+    finally:
+        posts_shm.close()
+        posts_shm.unlink()
 
     # Print summary using shared utility
     print_processing_summary(
@@ -478,6 +678,6 @@ def _process_working_directory(working_dir, output_dir, workers):
         output_dir=output_dir,
         extra_stats={
             "EXIF structures rebuilt": exif_rebuilt_count,
-            "Media type subfolders": len(media_types_set),
+            "Media type subfolders": len(media_type_dirs),
         },
     )
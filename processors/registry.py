@@ -6,6 +6,7 @@ Manages registration and discovery of all media processors.
 Supports detection of multiple processors per input directory.
 """
 
+import bisect
 from pathlib import Path
 from typing import Dict, List, Optional
 from processors.base import ProcessorBase
@@ -16,7 +17,12 @@ class ProcessorRegistry:
 
     def __init__(self):
         """Initialize empty processor registry"""
+        # Kept sorted by priority (highest first), registration order on ties
         self.processors: List[ProcessorBase] = []
+        # Negated priorities parallel to self.processors, for bisect
+        self._sort_keys: List[int] = []
+        # Lowercase name -> first processor registered under that name
+        self._by_name: Dict[str, ProcessorBase] = {}
 
     def register(self, processor: ProcessorBase) -> None:
         """Register a processor
@@ -39,7 +45,11 @@ class ProcessorRegistry:
                 f"Processor class must inherit from ProcessorBase, got {processor.__name__}"
             )
 
-        self.processors.append(processor)
+        sort_key = -processor.get_priority()
+        index = bisect.bisect_right(self._sort_keys, sort_key)
+        self._sort_keys.insert(index, sort_key)
+        self.processors.insert(index, processor)
+        self._by_name.setdefault(processor.get_name().lower(), processor)
 
     def detect_all(self, input_path: Path) -> List[ProcessorBase]:
         """Detect ALL processors that can handle this input
@@ -65,9 +75,7 @@ class ProcessorRegistry:
                 print(f"Warning: Detector for {processor.get_name()} failed: {e}")
                 continue
 
-        # Sort by priority (highest first) for consistent ordering
-        matches.sort(key=lambda p: p.get_priority(), reverse=True)
-
+        # Already in priority order (highest first), as self.processors is
         return matches
 
     def get_all_processors(self) -> List[ProcessorBase]:
@@ -76,7 +84,7 @@ class ProcessorRegistry:
         Returns:
             List of all processors, sorted by priority (highest first)
         """
-        return sorted(self.processors, key=lambda p: p.get_priority(), reverse=True)
+        return list(self.processors)
 
     def get_processor_count(self) -> int:
         """Get count of registered processors
@@ -95,11 +103,7 @@ class ProcessorRegistry:
         Returns:
             Matching processor class, or None if not found
         """
-        name_lower = name.lower()
-        for processor in self.processors:
-            if processor.get_name().lower() == name_lower:
-                return processor
-        return None
+        return self._by_name.get(name.lower())
 
     def group_for_consolidation(
         self, input_paths: List[Path]
@@ -5,18 +5,20 @@ This processor is designed to be used through memoria.py.
 It handles adding overlays to videos and embedding metadata into all Snapchat Memories files.
 """
 
-import json
+import hashlib
 import logging
 import multiprocessing
 import os
-import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from common import json_utils
+from common.copy_utils import fast_copy
 from common.dependency_checker import (
     check_exiftool,
     check_ffmpeg,
+    check_pillow,
     print_exiftool_error,
     print_ffmpeg_error,
 )
@@ -25,26 +27,41 @@ from common.exiftool_batch import (
     batch_rebuild_exif,
     batch_read_existing_metadata,
     batch_write_metadata_snapchat_memories,
+    start_exiftool_session,
 )
 from common.failure_tracker import FailureTracker
 from common.filter_banned_files import BannedFilesFilter
 from common.overlay import (
     create_image_with_overlay,
     create_video_with_overlay,
+    retag_video_with_overlay,
 )
 from common.processing import print_processing_summary
-from common.progress import PHASE_PROCESS, progress_bar
+from common.progress import PHASE_EXIF, PHASE_PROCESS, counter_progress, progress_bar
 from common.utils import (
     default_worker_count,
     extract_username_from_export_dir,
     get_media_type,
-    update_file_timestamps,
 )
 from processors.base import ProcessorBase
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# File creation tasks are handed to the pool this many at a time. The task
+# count isn't known up front since metadata is streamed, so this is fixed:
+# large enough to cut IPC round trips, small enough to keep workers balanced
+TASK_CHUNK_SIZE = 16
+
+# EXIF work is split into about this many contiguous shards per worker, so
+# workers stay busy until the end while each shard still amortizes its
+# exiftool calls
+EXIF_SHARDS_PER_WORKER = 4
+# Shards are capped at the exiftool helpers' chunk size. Progress is only
+# reported to the parent as shards complete (workers draw no bars), so this
+# keeps the EXIF progress bar moving on large exports.
+EXIF_MAX_SHARD_SIZE = 500
+
 
 # ============================================================================
 # Processor Detection and Registration (for unified memoria.py)
@@ -70,35 +87,37 @@ def detect(input_path: Path) -> bool:
     try:
         # Helper function to check if a path contains valid memories structure
         def check_memories_structure(base_path: Path) -> bool:
-            media_dir = base_path / "media"
-            overlays_dir = base_path / "overlays"
-            metadata_file = base_path / "metadata.json"
+            # Check if required directories and file exist, from one
+            # directory listing (entry types come with it on most platforms)
+            try:
+                with os.scandir(base_path) as it:
+                    entries = {entry.name: entry for entry in it}
+            except OSError:
+                return False
 
-            # Check if required directories and file exist
-            if not media_dir.exists() or not media_dir.is_dir():
+            media_dir = entries.get("media")
+            if media_dir is None or not media_dir.is_dir():
                 return False
 
-            if not overlays_dir.exists() or not overlays_dir.is_dir():
+            overlays_dir = entries.get("overlays")
+            if overlays_dir is None or not overlays_dir.is_dir():
                 return False
 
-            if not metadata_file.exists() or not metadata_file.is_file():
+            metadata_file = entries.get("metadata.json")
+            if metadata_file is None or not metadata_file.is_file():
                 return False
 
-            # Validate metadata.json structure
+            # Validate metadata.json structure. Only the first memory is
+            # parsed (streamed when ijson is installed), since detection runs
+            # for every registered processor and the file can be large.
             try:
-                with open(metadata_file, "r", encoding="utf-8") as f:
-                    metadata = json.load(f)
+                first_memory = json_utils.load_first_item(metadata_file.path)
 
-                # Should be a list/array
-                if not isinstance(metadata, list):
-                    return False
-
-                # Should have at least one memory
-                if len(metadata) == 0:
+                # Should be a non-empty list/array of memory objects
+                if not isinstance(first_memory, dict):
                     return False
 
                 # Check first memory has expected fields
-                first_memory = metadata[0]
                 required_fields = ["date", "media_type", "media_filename"]
 
                 for field in required_fields:
@@ -108,14 +127,12 @@ def detect(input_path: Path) -> bool:
                 # This looks like a Snapchat Memories export
                 return True
 
-            except (json.JSONDecodeError, KeyError, IndexError):
+            except (ValueError, KeyError, IndexError):
                 return False
 
         # Check for consolidated structure first (memories/ subdirectory)
-        memories_subdir = input_path / "memories"
-        if memories_subdir.exists() and memories_subdir.is_dir():
-            if check_memories_structure(memories_subdir):
-                return True
+        if check_memories_structure(input_path / "memories"):
+            return True
 
         # Check for direct structure (old format)
         if check_memories_structure(input_path):
@@ -124,7 +141,7 @@ def detect(input_path: Path) -> bool:
         return False
 
     except Exception as e:
-        logger.debug(f"Detection failed for Snapchat Memories: {e}")
+        logger.debug("Detection failed for Snapchat Memories: %s", e)
         return False
 
 
@@ -235,16 +252,7 @@ def get_processor():
 # ============================================================================
 
 
-def check_pillow():
-    """Check if PIL/Pillow is installed"""
-    try:
-        __import__("PIL")
-        return True
-    except ImportError:
-        return False
-
-
-def generate_unique_filename(memory_data, export_username, extension, used_filenames):
+def generate_unique_filename(memory_data, export_username, extension, counters):
     """Generate a unique filename for a processed memory
 
     Format: snap-memories-{exportUsername}-YYYYMMDD.extension
@@ -254,7 +262,8 @@ def generate_unique_filename(memory_data, export_username, extension, used_filen
         memory_data: Dict containing memory metadata
         export_username: Username extracted from input directory
         extension: File extension (including the dot)
-        used_filenames: Set tracking already-used filenames
+        counters: Dict mapping (date_key, extension) to the number of
+                  filenames already generated for that key
 
     Returns:
         str: Generated filename
@@ -262,148 +271,286 @@ def generate_unique_filename(memory_data, export_username, extension, used_filen
     # Parse date from memory_data
     # Format: "2021-01-04 23:08:30 UTC"
     date_str = memory_data["date"]
-    date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S UTC")
-    date_key = date_obj.strftime("%Y%m%d")
+    if len(date_str) == 23 and date_str[4] == "-" and date_str[7] == "-":
+        # Exports always use this fixed format, so the date key can be
+        # sliced out without a strptime/strftime round trip
+        date_key = date_str[0:4] + date_str[5:7] + date_str[8:10]
+    else:
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S UTC")
+        date_key = date_obj.strftime("%Y%m%d")
 
-    # Generate base filename without sequence
-    base_filename = f"snap-memories-{export_username}-{date_key}{extension}"
+    # Every name for a key is generated here in sequence, so the next free
+    # sequence number follows from the count so far (duplicates start at _2)
+    key = (date_key, extension)
+    count = counters.get(key, 0) + 1
+    counters[key] = count
 
-    # Check if base filename is already used
-    if base_filename not in used_filenames:
-        used_filenames.add(base_filename)
-        return base_filename
+    suffix = f"_{count}" if count > 1 else ""
+    return f"snap-memories-{export_username}-{date_key}{suffix}{extension}"
 
-    # If duplicate, find next available sequence number
-    sequence = 2
-    while True:
-        filename = f"snap-memories-{export_username}-{date_key}_{sequence}{extension}"
-        if filename not in used_filenames:
-            used_filenames.add(filename)
-            return filename
-        sequence += 1
 
+def _timestamp_ns(date_str):
+    """Convert a memory date to nanoseconds since the epoch
 
-def _update_memory_timestamps(file_path, memory_data):
-    """Update filesystem creation and modification timestamps to match memory date
+    Matches update_file_timestamps() for "2021-01-04 23:08:30 UTC" dates,
+    which it reads as local time once the " UTC" suffix is dropped.
 
-    Wrapper around shared update_file_timestamps that handles Snapchat Memories
-    date format: "2021-01-04 23:08:30 UTC"
+    Args:
+        date_str: Date like "2021-01-04 23:08:30 UTC", or None
+
+    Returns:
+        int nanoseconds, or None if the date is missing or invalid
+    """
+    if not date_str:
+        return None
+    if date_str.endswith(" UTC"):
+        date_str = date_str[:-4]
+    try:
+        date_obj = datetime.fromisoformat(date_str)
+    except ValueError as e:
+        logger.warning(f"Failed to parse memory date {date_str!r}: {e}")
+        return None
+    return int(date_obj.timestamp()) * 1_000_000_000
+
+
+def _update_memory_timestamps(file_path, timestamp_ns):
+    """Update filesystem access and modification timestamps to the memory date
 
     Args:
         file_path: Path to the file
-        memory_data: Dict containing memory metadata with 'date' field
+        timestamp_ns: Memory date from _timestamp_ns(), or None to leave the
+                      file's timestamps unchanged
 
     Returns:
         bool: True if successful, False otherwise
     """
-    date_str = memory_data.get("date")
-    if not date_str:
+    if timestamp_ns is None:
+        return False
+    try:
+        os.utime(file_path, ns=(timestamp_ns, timestamp_ns))
+        return True
+    except OSError as e:
+        logger.warning(f"Failed to update timestamps for {file_path}: {e}")
         return False
 
-    # Snapchat Memories uses format: "2021-01-04 23:08:30 UTC"
-    return update_file_timestamps(file_path, date_str, "%Y-%m-%d %H:%M:%S")
+
+# Memory fields read by create_memory_file and the video overlay helper;
+# tasks carry only these, not the whole memory
+_WORKER_MEMORY_KEYS = ("media_filename", "overlay_filename", "date", "latitude", "longitude")
+
+# Per-worker state, set once per pool worker by _init_memory_worker
+_worker_media_dir = None
+_worker_overlays_dir = None
+_worker_output_dir = None
+_worker_export_username = None
+
+# Content key -> MKV already encoded by this worker, so repeated memories
+# (the same video and overlay saved more than once) are only encoded once
+_worker_encoded_videos = {}
+
+# Read size used when hashing media for _content_key
+_HASH_BUFSIZE = 1024 * 1024
+
+
+def _content_key(*paths):
+    """Hash the contents of the given files, in order, into one key
+
+    Args:
+        *paths: File paths
+
+    Returns:
+        bytes digest
+
+    Raises:
+        OSError: If a file can't be read
+    """
+    digest = hashlib.blake2b()
+    for path in paths:
+        with open(path, "rb") as f:
+            # Length-prefix each file so content can't shift between them
+            digest.update(os.fstat(f.fileno()).st_size.to_bytes(8, "little"))
+            for block in iter(lambda: f.read(_HASH_BUFSIZE), b""):
+                digest.update(block)
+    return digest.digest()
+
+
+def _init_memory_worker(raw_dir, output_dir, export_username):
+    """Store values shared by every task in a pool worker (Pool initializer)
+
+    Args:
+        raw_dir: Export directory containing media/ and overlays/
+        output_dir: Output directory for created files
+        export_username: Username used for every file in this run
+    """
+    global _worker_media_dir, _worker_overlays_dir
+    global _worker_output_dir, _worker_export_username
+
+    _worker_media_dir = os.path.join(raw_dir, "media")
+    _worker_overlays_dir = os.path.join(raw_dir, "overlays")
+    _worker_output_dir = str(output_dir)
+    _worker_export_username = export_username
+    _worker_encoded_videos.clear()
 
 
 def create_memory_file(args_tuple):
     """Create output file with overlay if needed (Phase 1 worker function)
 
+    Must run in a worker initialized by _init_memory_worker.
+
     Args:
-        args_tuple: Tuple containing (memory, output_filename, raw_dir, output_dir, export_username)
+        args_tuple: Tuple containing (task_index, memory, output_filename,
+                    timestamp_ns), where memory holds only _WORKER_MEMORY_KEYS
+                    and timestamp_ns is applied to MKV outputs only
 
     Returns:
-        Tuple of (success: bool, output_path: str or None, is_mkv: bool, memory: dict,
-                  export_username: str, failure_reason: str or None)
+        Tuple of (task_index: int, success: bool, output_path: str or None,
+                  is_mkv: bool, failure_reason: str or None)
     """
-    memory, output_filename, raw_dir, output_dir, export_username = args_tuple
+    task_index, memory, output_filename, timestamp_ns = args_tuple
+    output_dir = _worker_output_dir
+    export_username = _worker_export_username
 
     media_filename = memory["media_filename"]
     overlay_filename = memory.get("overlay_filename")
 
-    media_dir = os.path.join(raw_dir, "media")
-    overlays_dir = os.path.join(raw_dir, "overlays")
-    media_path = os.path.join(media_dir, media_filename)
-
-    # Convert to Path objects once to avoid repeated conversions
-    media_path_obj = Path(media_path)
-
-    if not os.path.exists(media_path):
-        logger.warning(f"Media file not found: {media_path}")
-        return (False, None, False, memory, export_username, media_path)
-
-    # Determine if this is a video or image
-    is_video = get_media_type(media_filename) == "video"
-    is_image = get_media_type(media_filename) == "image"
+    overlays_dir = _worker_overlays_dir
+    media_path = os.path.join(_worker_media_dir, media_filename)
 
     # Process based on file type and whether overlay exists
     if overlay_filename:
+        # The overlay helpers need the media up front; without an overlay, a
+        # missing file is reported by the copy itself instead
+        if not os.path.exists(media_path):
+            logger.warning(f"Media file not found: {media_path}")
+            return (task_index, False, None, False, media_path)
+
+        # Determine if this is a video or image
+        media_type = get_media_type(media_filename)
+        is_video = media_type == "video"
+        is_image = media_type == "image"
+
         overlay_path = os.path.join(overlays_dir, overlay_filename)
-        overlay_path_obj = Path(overlay_path)
 
         if not os.path.exists(overlay_path):
             logger.warning(f"Overlay file not found: {overlay_path}")
             # Copy file without overlay
             output_path = os.path.join(output_dir, output_filename)
-            shutil.copy2(media_path, output_path)
-            _update_memory_timestamps(output_path, memory)
-            return (True, output_path, False, memory, export_username, None)
+            fast_copy(media_path, output_path)
+            return (task_index, True, output_path, False, None)
 
         if is_video:
             # Video with overlay - create multi-track MKV
             # Change extension to .mkv in output filename
             output_filename_mkv = os.path.splitext(output_filename)[0] + ".mkv"
             output_path = os.path.join(output_dir, output_filename_mkv)
-            output_path_obj = Path(output_path)
 
-            # Use the imported function with metadata (embeds metadata during creation)
+            # Same video and overlay as an MKV this worker already encoded:
+            # copy it with this memory's metadata instead of re-encoding
+            try:
+                content_key = _content_key(media_path, overlay_path)
+            except OSError as e:
+                logger.debug("Cannot hash %s for reuse: %s", media_path, e)
+                content_key = None
+            encoded_path = _worker_encoded_videos.get(content_key)
+            if encoded_path is not None and retag_video_with_overlay(
+                Path(encoded_path),
+                Path(output_path),
+                memory,
+                export_username=export_username,
+            ):
+                _update_memory_timestamps(output_path, timestamp_ns)
+                return (task_index, True, output_path, True, None)
+
+            # Use the imported function with metadata (embeds metadata during
+            # creation). Paths stay strings until here, the only place that
+            # needs Path objects.
             if create_video_with_overlay(
-                media_path_obj,
-                overlay_path_obj,
-                output_path_obj,
+                Path(media_path),
+                Path(overlay_path),
+                Path(output_path),
                 memory,
                 export_username=export_username,
             ):
-                # Update filesystem timestamps
-                _update_memory_timestamps(output_path, memory)
+                if content_key is not None:
+                    _worker_encoded_videos[content_key] = output_path
+                # Update filesystem timestamps (other files get theirs after
+                # the Phase 3 EXIF write, which would otherwise reset them)
+                _update_memory_timestamps(output_path, timestamp_ns)
                 # MKV files already have metadata embedded, mark as such
-                return (True, output_path, True, memory, export_username, None)
+                return (task_index, True, output_path, True, None)
             else:
                 # Multi-track creation failed, copy original video with original extension
                 fallback_path = os.path.join(output_dir, output_filename)
-                shutil.copy2(media_path, fallback_path)
-                _update_memory_timestamps(fallback_path, memory)
+                fast_copy(media_path, fallback_path)
                 # Fallback file needs batch EXIF processing
-                return (True, fallback_path, False, memory, export_username, None)
+                return (task_index, True, fallback_path, False, None)
 
         elif is_image:
             # Image with overlay - composite
             output_path = os.path.join(output_dir, output_filename)
-            output_path_obj = Path(output_path)
 
             # Use the imported function
             if create_image_with_overlay(
-                media_path_obj, overlay_path_obj, output_path_obj
+                Path(media_path), Path(overlay_path), Path(output_path)
             ):
-                _update_memory_timestamps(output_path, memory)
                 # Image needs batch EXIF processing
-                return (True, output_path, False, memory, export_username, None)
+                return (task_index, True, output_path, False, None)
             else:
                 # Image processing failed, copy original
-                shutil.copy2(media_path, output_path)
-                _update_memory_timestamps(output_path, memory)
-                return (True, output_path, False, memory, export_username, None)
+                fast_copy(media_path, output_path)
+                return (task_index, True, output_path, False, None)
         else:
             # Unknown file type with overlay - just copy
             output_path = os.path.join(output_dir, output_filename)
-            shutil.copy2(media_path, output_path)
-            _update_memory_timestamps(output_path, memory)
-            return (True, output_path, False, memory, export_username, None)
+            fast_copy(media_path, output_path)
+            return (task_index, True, output_path, False, None)
     else:
         # No overlay - just copy
         output_path = os.path.join(output_dir, output_filename)
-        shutil.copy2(media_path, output_path)
-        _update_memory_timestamps(output_path, memory)
+        try:
+            fast_copy(media_path, output_path)
+        except FileNotFoundError:
+            logger.warning(f"Media file not found: {media_path}")
+            return (task_index, False, None, False, media_path)
         # File needs batch EXIF processing
-        return (True, output_path, False, memory, export_username, None)
+        return (task_index, True, output_path, False, None)
+
+
+def _init_exif_worker():
+    """Give an EXIF pool worker its own persistent exiftool (Pool initializer)"""
+    start_exiftool_session(lazy=True)
+
+
+def process_exif_shard(file_info):
+    """Validate, rebuild, read and write EXIF for one shard of files
+
+    Then sets each file's access and modification times to its memory date.
+    This runs after the write, which resets them, and covers files exiftool
+    rejected or skipped. Must run in a worker initialized by
+    _init_exif_worker.
+
+    Args:
+        file_info: List of (file_path, memory, export_username) tuples
+
+    Returns:
+        Tuple of (files processed, EXIF structures rebuilt)
+    """
+    file_paths = [file_path for file_path, _, _ in file_info]
+
+    # Batch validate and rebuild
+    corrupted_files = batch_validate_exif(file_paths)
+    if corrupted_files:
+        logger.info(f"Rebuilding {len(corrupted_files)} corrupted EXIF structures...")
+        batch_rebuild_exif(list(corrupted_files))
+
+    # Batch read and write metadata
+    existing_metadata_map = batch_read_existing_metadata(file_paths)
+    batch_write_metadata_snapchat_memories(file_info, existing_metadata_map)
+
+    for file_path, memory, _ in file_info:
+        _update_memory_timestamps(file_path, _timestamp_ns(memory.get("date")))
+
+    return (len(file_paths), len(corrupted_files))
 
 
 def process_logic(
@@ -463,15 +610,9 @@ def process_logic(
         logger.error("Please run download_memories.py first")
         return
 
-    # Load metadata
-    logger.info(f"Loading metadata from {metadata_file}...")
-    with open(metadata_file, "r", encoding="utf-8") as f:
-        memories = json.load(f)
-    logger.info(f"Found {len(memories)} memories to process")
-
     # Initialize banned files filter
     banned_filter = BannedFilesFilter()
-    logger.debug(f"Banned file patterns: {', '.join(banned_filter.get_patterns())}")
+    logger.debug("Banned file patterns: %s", ", ".join(banned_filter.get_patterns()))
 
     # Initialize failure tracker
     failure_tracker = FailureTracker(
@@ -479,115 +620,135 @@ def process_logic(
         export_directory=raw_dir,
     )
 
-    # Track orphaned media files (files in media/ not referenced in metadata)
-    media_dir = Path(raw_dir) / "media"
-    if media_dir.exists():
-        # Build set of all media filenames referenced in metadata
-        referenced_files = {memory["media_filename"] for memory in memories}
-
-        # Scan media directory for all files
-        for media_file in media_dir.iterdir():
-            if media_file.is_file():
-                # Skip banned files - they're intentionally excluded
-                if banned_filter.is_banned(media_file):
-                    continue
-                if media_file.name not in referenced_files:
-                    logger.debug(f"Orphaned media file (no metadata): {media_file.name}")
-                    failure_tracker.add_orphaned_media(
-                        media_path=media_file,
-                        reason="No matching metadata found",
-                        context={"original_location": str(media_file)},
-                    )
-
     # Create output directory (subdirectory already set by caller)
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True, parents=True)
 
     # Determine number of workers
     num_workers = workers if workers is not None else default_worker_count()
-    logger.debug(f"Using {num_workers} parallel workers")
+    logger.debug("Using %d parallel workers", num_workers)
 
-    # Pre-generate all output filenames to avoid race conditions
-    logger.debug("Pre-generating filenames...")
-    used_filenames = set()
-    processing_tasks = []
+    # Output filenames are generated in metadata order as memories are
+    # parsed, which avoids races between workers
+    filename_counters = {}
+    task_memories = []  # Full memory for each task, by task index
+    referenced_files = set()  # Media filenames named in metadata
     skipped_count = 0
 
-    for memory in memories:
-        media_filename = memory["media_filename"]
-        overlay_filename = memory.get("overlay_filename")
-
-        # Check if media file should be skipped
-        media_path = Path(media_filename)
-        if banned_filter.is_banned(media_path):
-            logger.debug(f"Skipping banned media file: {media_filename}")
-            skipped_count += 1
-            continue
-
-        # Check if overlay file should be skipped (if it exists)
-        if overlay_filename:
-            overlay_path = Path(overlay_filename)
-            if banned_filter.is_banned(overlay_path):
-                logger.debug(f"Skipping banned overlay file: {overlay_filename}")
+    def generate_tasks():
+        """Yield a worker task per memory while metadata.json is streamed"""
+        nonlocal skipped_count
+
+        for memory in json_utils.iter_array(metadata_file):
+            media_filename = memory["media_filename"]
+            overlay_filename = memory.get("overlay_filename")
+            referenced_files.add(media_filename)
+
+            # Check if media file should be skipped. Per-memory debug messages
+            # use %-style arguments so they aren't formatted when debug
+            # logging is off
+            if banned_filter.is_banned_name(os.path.basename(media_filename)):
+                logger.debug("Skipping banned media file: %s", media_filename)
                 skipped_count += 1
                 continue
 
-        file_ext = os.path.splitext(media_filename)[1].lower()
+            # Check if overlay file should be skipped (if it exists)
+            if overlay_filename:
+                if banned_filter.is_banned_name(os.path.basename(overlay_filename)):
+                    logger.debug("Skipping banned overlay file: %s", overlay_filename)
+                    skipped_count += 1
+                    continue
 
-        # Generate output filename
-        output_filename = generate_unique_filename(
-            memory, export_username, file_ext, used_filenames
-        )
+            file_ext = os.path.splitext(media_filename)[1].lower()
 
-        # Create task tuple for worker
-        processing_tasks.append(
-            (memory, output_filename, raw_dir, output_path, export_username)
-        )
+            # Generate output filename
+            output_filename = generate_unique_filename(
+                memory, export_username, file_ext, filename_counters
+            )
 
-    # Report on filtered files
-    if skipped_count > 0:
-        logger.info(f"Skipped {skipped_count} banned files")
+            # Task tuple for worker, with the date parsed once here. Values
+            # shared by every task are sent once per worker instead.
+            task_index = len(task_memories)
+            task_memories.append(memory)
+            yield (
+                task_index,
+                {key: memory[key] for key in _WORKER_MEMORY_KEYS if key in memory},
+                output_filename,
+                _timestamp_ns(memory.get("date")),
+            )
 
     # Phase 1: Create all files with overlays in parallel
-    print(f"\nProcessing {len(processing_tasks)} memories to {output_path}/")
+    logger.info(f"Streaming metadata from {metadata_file}...")
+    print(f"\nProcessing memories to {output_path}/")
     logger.info("=" * 50)
 
     success_count = 0
     failed_count = 0
 
-    # Use multiprocessing pool with progress bar
-    with multiprocessing.Pool(processes=num_workers) as pool:
+    # Use multiprocessing pool with progress bar. metadata.json is parsed
+    # incrementally (with ijson) while the pool consumes tasks, so workers
+    # start before parsing finishes; the task total is therefore unknown
+    # up front. Each result carries its own task index, so results are taken
+    # in completion order, a few tasks per dispatch to cut IPC round trips.
+    # Phase 2 runs as results arrive: non-MKV files are collected for batch
+    # EXIF processing (MKV files already have metadata from overlay creation)
+    file_info = []
+
+    with multiprocessing.Pool(
+        processes=num_workers,
+        initializer=_init_memory_worker,
+        initargs=(raw_dir, output_path, export_username),
+    ) as pool:
         # Create files and show progress
-        results = list(
-            progress_bar(
-                pool.imap(create_memory_file, processing_tasks),
-                PHASE_PROCESS,
-                "Creating files",
-                total=len(processing_tasks),
-            )
-        )
+        for task_index, success, file_path, is_mkv, failure_info in progress_bar(
+            pool.imap_unordered(
+                create_memory_file, generate_tasks(), chunksize=TASK_CHUNK_SIZE
+            ),
+            PHASE_PROCESS,
+            "Creating files",
+        ):
+            memory = task_memories[task_index]
+            if success and file_path:
+                success_count += 1
+                if not is_mkv:
+                    file_info.append((file_path, memory, export_username))
+            else:
+                failed_count += 1
+                # Track orphaned metadata (metadata without corresponding media file)
+                if failure_info:
+                    failure_tracker.add_orphaned_metadata(
+                        metadata_entry=memory,
+                        reason="Media file not found in filesystem",
+                        context={"expected_path": failure_info},
+                    )
 
-    # Phase 2: Collect non-MKV files for batch EXIF processing
-    file_paths = []
-    file_info = []
+    memory_count = len(task_memories) + skipped_count
+    logger.info(f"Found {memory_count} memories to process")
 
-    for success, output_path, is_mkv, memory, export_username, failure_info in results:
-        if success and output_path:
-            success_count += 1
-            # Only add non-MKV files to batch processing list
-            # (MKV files already have metadata from overlay creation)
-            if not is_mkv:
-                file_paths.append(output_path)
-                file_info.append((output_path, memory, export_username))
-        else:
-            failed_count += 1
-            # Track orphaned metadata (metadata without corresponding media file)
-            if failure_info:
-                failure_tracker.add_orphaned_metadata(
-                    metadata_entry=memory,
-                    reason="Media file not found in filesystem",
-                    context={"expected_path": failure_info},
-                )
+    # Report on filtered files
+    if skipped_count > 0:
+        logger.info(f"Skipped {skipped_count} banned files")
+
+    # Track orphaned media files (files in media/ not referenced in metadata)
+    media_dir = os.path.join(raw_dir, "media")
+    if os.path.isdir(media_dir):
+        # Scan media directory for all files (entry types come from the
+        # directory listing, so there is no stat per file)
+        with os.scandir(media_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                # Skip banned files - they're intentionally excluded
+                if banned_filter.is_banned_name(entry.name):
+                    continue
+                if entry.name not in referenced_files:
+                    logger.debug("Orphaned media file (no metadata): %s", entry.name)
+                    media_file = Path(entry.path)
+                    failure_tracker.add_orphaned_media(
+                        media_path=media_file,
+                        reason="No matching metadata found",
+                        context={"original_location": str(media_file)},
+                    )
 
     logger.info(
         f"\nCreated {success_count} files ({len(file_info)} need EXIF processing)"
@@ -595,21 +756,35 @@ def process_logic(
 
     # Phase 3: Batch process EXIF operations on non-MKV files
     exif_rebuilt_count = 0
-    if file_paths:
+    if file_info:
         logger.info("Batch processing EXIF metadata...")
 
-        # Batch validate and rebuild
-        corrupted_files = batch_validate_exif(file_paths)
-        if corrupted_files:
-            logger.info(
-                f"Rebuilding {len(corrupted_files)} corrupted EXIF structures..."
-            )
-            batch_rebuild_exif(list(corrupted_files))
-            exif_rebuilt_count = len(corrupted_files)
-
-        # Batch read and write metadata
-        existing_metadata_map = batch_read_existing_metadata(file_paths)
-        batch_write_metadata_snapchat_memories(file_info, existing_metadata_map)
+        # Shard contiguous runs of files (sorted by path for locality) across
+        # workers, each of which runs all four passes on its own persistent
+        # exiftool process
+        file_info.sort(key=lambda info: info[0])
+        shard_size = min(
+            EXIF_MAX_SHARD_SIZE,
+            -(-len(file_info) // (num_workers * EXIF_SHARDS_PER_WORKER)),
+        )
+        shards = [
+            file_info[i : i + shard_size] for i in range(0, len(file_info), shard_size)
+        ]
+        with multiprocessing.Pool(
+            processes=min(num_workers, len(shards)),
+            initializer=_init_exif_worker,
+        ) as pool:
+            with counter_progress(
+                len(file_info), PHASE_EXIF, "Processing EXIF"
+            ) as progress:
+                for processed, rebuilt in pool.imap_unordered(process_exif_shard, shards):
+                    exif_rebuilt_count += rebuilt
+                    progress.update(processed)
+
+            # Let workers exit normally so their exiftool processes are
+            # closed, rather than being terminated by the context manager
+            pool.close()
+            pool.join()
 
     # Handle failures - copy orphaned files and generate report
     failure_tracker.handle_failures(output_path)
@@ -623,7 +798,7 @@ def process_logic(
         extra_stats={
             "EXIF structures rebuilt": exif_rebuilt_count,
             "Skipped (banned files)": skipped_count,
-            "Total memories": len(memories),
+            "Total memories": memory_count,
         },
     )
     print("\nNote: Videos with overlays are saved as multi-track MKV files:")
@@ -8,19 +8,24 @@ Organizes Snapchat export files and creates cleaned metadata:
 - Creates metadata.json with essential information
 """
 
-import json
 import logging
+import mmap
+import os
 import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timezone
+from functools import lru_cache
 import re
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 import multiprocessing
 import xxhash
 
+from common import json_utils
+from common.copy_utils import fast_copy
 from common.filter_banned_files import BannedFilesFilter
 from common.failure_tracker import FailureTracker
 
@@ -31,6 +36,30 @@ logger = logging.getLogger(__name__)
 class SnapchatPreprocessor:
     """Preprocesses Snapchat export by organizing files and cleaning metadata"""
 
+    # Compiled regex patterns for better performance (run once per file)
+    EXPORT_DIR_PATTERN = re.compile(r"snapchat-(.+?)-\d{4}-?\d{2}-?\d{2}")
+    HASH_MEDIA_PATTERN = re.compile(
+        r"^\d{4}-\d{2}-\d{2}_[a-f0-9]{32}\.(jpg|jpeg|mp4|png|webp)$", re.IGNORECASE
+    )
+    DATE_PREFIX_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})_")
+    MEDIA_ID_PATTERN = re.compile(r"_b~([^.]+)")
+    UUID_PATTERN = re.compile(
+        r"~zip-([0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12})",
+        re.IGNORECASE,
+    )
+    HASH_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}_([a-f0-9]{32})\.\w+$", re.IGNORECASE)
+    # Date prefix plus the media key, in extract_media_id > extract_uuid >
+    # extract_hash priority, in one match (build_file_catalog's hot path)
+    MEDIA_KEYS_PATTERN = re.compile(
+        r"^(?:(?P<date>\d{4}-\d{2}-\d{2})_)?"
+        r"(?:.*?(?<=_)b~(?P<media_id>[^.]+)"
+        r"|.*?~zip-(?P<uuid>(?i:[0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12}))"
+        r"|(?(date)(?P<hash>(?i:[a-f0-9]{32}))\.\w+$))?"
+    )
+    GROUP_ID_PATTERN = re.compile(
+        r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+    )
+
     def __init__(
         self,
         export_path: Path,
@@ -153,24 +182,33 @@ class SnapchatPreprocessor:
             print(f"ERROR: chat_history.json not found: {self.chat_history_file}")
             return False
 
-        return True
-
-    def load_chat_history(self) -> Dict:
-        """Load and parse chat_history.json"""
+        # chat_history.json is streamed later, so check it parses now rather
+        # than failing partway through building the metadata
         try:
-            with open(self.chat_history_file, "r", encoding="utf-8") as f:
-                chat_history = json.load(f)
-
-            print("SUCCESS: Loaded chat_history.json")
-            return chat_history
-        except json.JSONDecodeError as e:
+            json_utils.validate_object(str(self.chat_history_file))
+        except ValueError as e:
             logger.error(f"Failed to parse chat_history.json: {e}")
-            sys.exit(1)
-        except Exception as e:
+            return False
+        except OSError as e:
             print(f"ERROR: Error loading chat_history.json: {e}")
-            sys.exit(1)
+            return False
+        print("SUCCESS: Loaded chat_history.json")
 
-    def extract_username(self, chat_history: Dict) -> str:
+        return True
+
+    def iter_conversations(self) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yield (conversation_id, messages) pairs from chat_history.json
+
+        The file is streamed with ijson when it is installed, so only one
+        conversation is held in memory at a time. validate_export() checks
+        that it parses before anything is streamed.
+
+        Raises:
+            ValueError: If chat_history.json is not valid JSON
+        """
+        yield from json_utils.iter_items(str(self.chat_history_file))
+
+    def extract_username(self) -> str:
         """Extract exporter's username from directory name or chat history"""
         # Use override if provided (for consolidated exports)
         if self.username_override:
@@ -180,14 +218,15 @@ class SnapchatPreprocessor:
         # Method 1: From directory name using regex to handle both date formats
         dir_name = self.export_path.name
         # Pattern: snapchat-{username}-YYYY-MM-DD or snapchat-{username}-YYYYMMDD
-        match = re.match(r"snapchat-(.+?)-\d{4}-?\d{2}-?\d{2}", dir_name)
+        match = self.EXPORT_DIR_PATTERN.match(dir_name)
         if match:
             username = match.group(1)
             print(f"SUCCESS: Extracted username from directory: {username}")
             return username
 
-        # Method 2: Find messages where IsSender is True
-        for messages in chat_history.values():
+        # Method 2: Find messages where IsSender is True, reading
+        # chat_history.json only up to the first one
+        for _, messages in self.iter_conversations():
             for message in messages:
                 if message.get("IsSender", False):
                     username = message["From"]
@@ -199,44 +238,39 @@ class SnapchatPreprocessor:
 
     def classify_file(self, filename: str) -> str:
         """Classify file by type based on filename pattern"""
-        # Skip system files
-        if (
-            filename.startswith(".")
-            or filename.startswith("._")
-            or filename.startswith("__")
-        ):
+        # Skip system files (".", which covers "._", and "__")
+        if filename.startswith((".", "__")):
             return "system"
 
-        # Base64-encoded media (primary pattern)
-        if "_b~" in filename:
-            return "media"
+        # Every marker below contains "~", so names without one (such as
+        # hash-based media) skip straight to the pattern check
+        if "~" in filename:
+            # Base64-encoded media (primary pattern)
+            if "_b~" in filename:
+                return "media"
 
-        # UUID-based media files (with or without 'zip-')
-        if "_media~zip-" in filename or "_media~" in filename:
-            return "media"
+            # UUID-based media files ("_media~" also matches "_media~zip-")
+            if "_media~" in filename:
+                return "media"
 
-        # Overlay files (with or without 'zip-')
-        if "_overlay~zip-" in filename or "_overlay~" in filename:
-            return "overlay"
+            # Overlay files (with or without 'zip-')
+            if "_overlay~" in filename:
+                return "overlay"
 
-        # Thumbnail files (with or without 'zip-')
-        if "_thumbnail~zip-" in filename or "_thumbnail~" in filename:
-            return "thumbnail"
+            # Thumbnail files (with or without 'zip-')
+            if "_thumbnail~" in filename:
+                return "thumbnail"
 
         # Hash-based media (YYYY-MM-DD_<hex_hash>.ext)
         # Pattern: date prefix followed by 32-character hex string (MD5 hash)
-        if re.match(
-            r"^\d{4}-\d{2}-\d{2}_[a-f0-9]{32}\.(jpg|jpeg|mp4|png|webp)$",
-            filename,
-            re.IGNORECASE,
-        ):
+        if self.HASH_MEDIA_PATTERN.match(filename):
             return "media"
 
         return "unknown"
 
     def extract_date_from_filename(self, filename: str) -> Optional[str]:
         """Extract date from filename (YYYY-MM-DD prefix)"""
-        match = re.match(r"^(\d{4}-\d{2}-\d{2})_", filename)
+        match = self.DATE_PREFIX_PATTERN.match(filename)
         if match:
             return match.group(1)
         return None
@@ -245,31 +279,42 @@ class SnapchatPreprocessor:
         """Extract media ID from b~encoded filename"""
         if "_b~" in filename:
             # Extract everything between _b~ and the file extension
-            match = re.search(r"_b~([^.]+)", filename)
+            match = self.MEDIA_ID_PATTERN.search(filename)
             if match:
                 return f"b~{match.group(1)}"
         return None
 
     def extract_uuid(self, filename: str) -> Optional[str]:
         """Extract UUID from media~zip or overlay~zip filename"""
-        match = re.search(
-            r"~zip-([0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12})",
-            filename,
-            re.IGNORECASE,
-        )
+        match = self.UUID_PATTERN.search(filename)
         if match:
             return match.group(1)
         return None
 
     def extract_hash(self, filename: str) -> Optional[str]:
         """Extract hash from hash-based filename (YYYY-MM-DD_<hash>.ext)"""
-        match = re.match(
-            r"^\d{4}-\d{2}-\d{2}_([a-f0-9]{32})\.\w+$", filename, re.IGNORECASE
-        )
+        match = self.HASH_PATTERN.match(filename)
         if match:
             return match.group(1)
         return None
 
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _message_timestamp_ns(date_str: str) -> int:
+        """Convert a message's "YYYY-MM-DD HH:MM:SS UTC" date to Unix nanoseconds
+
+        Parsed with datetime.fromisoformat (several times faster than
+        strptime). Results are cached because bursts of messages share the
+        same second-resolution timestamp.
+
+        Raises:
+            ValueError: If date_str is not in that format
+        """
+        # Remove " UTC" suffix, parse as naive datetime, then treat as UTC
+        message_dt = datetime.fromisoformat(date_str.replace(" UTC", ""))
+        seconds = int(message_dt.replace(tzinfo=timezone.utc).timestamp())
+        return seconds * 1_000_000_000
+
     def get_media_type(self, filename: str) -> str:
         """Determine if file is image or video based on extension - use common utility"""
         from common.utils import get_media_type as common_get_media_type
@@ -278,18 +323,32 @@ class SnapchatPreprocessor:
 
     def _compute_file_hash(self, file_path: Path) -> str:
         """
-        Compute xxHash64 of file for deduplication (fast, non-cryptographic)
-        
+        Compute XXH3-64 of file for deduplication (fast, non-cryptographic)
+
+        The file is memory-mapped and hashed in a single update call, so the
+        hash runs over the whole file in C instead of a Python read loop.
+        Hashes are only compared within one run, so the algorithm can differ
+        from other processors.
+
         Args:
             file_path: Path to file to hash
-            
+
         Returns:
             str: Hexadecimal hash digest
         """
-        hasher = xxhash.xxh64()
+        hasher = xxhash.xxh3_64()
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(65536), b''):  # 64KB chunks
-                hasher.update(chunk)
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Empty file (nothing to map) or a file that can't be mapped
+                for chunk in iter(lambda: f.read(65536), b''):  # 64KB chunks
+                    hasher.update(chunk)
+                return hasher.hexdigest()
+            with mapped:
+                if hasattr(mapped, "madvise"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                hasher.update(mapped)
         return hasher.hexdigest()
 
     def classify_conversation(
@@ -309,8 +368,7 @@ class SnapchatPreprocessor:
                 return "group", title
 
         # UUID pattern indicates group chat
-        uuid_pattern = r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
-        if re.match(uuid_pattern, conversation_id):
+        if self.GROUP_ID_PATTERN.match(conversation_id):
             return "group", None
 
         return "dm", None
@@ -345,18 +403,16 @@ class SnapchatPreprocessor:
         """
         catalog = {}
 
-        import os
         with os.scandir(self.chat_media_dir) as entries:
             for entry in entries:
                 if not entry.is_file():
                     continue
 
-                file_path = Path(entry.path)
                 self.stats["total_files"] += 1
                 filename = entry.name
 
                 # Check if file is banned (NAS system files, etc.)
-                if self.banned_filter.is_banned(file_path):
+                if self.banned_filter.is_banned_name(filename):
                     self.stats["banned_files"] += 1
                     self.log_failure(
                         "BANNED_FILE",
@@ -384,32 +440,33 @@ class SnapchatPreprocessor:
                     print(f"WARNING: Unknown file type: {filename}")
                     continue
 
-                # Get file modification time (key for matching media with overlays)
-                mtime = file_path.stat().st_mtime
+                # Get file modification time (key for matching media with
+                # overlays), as integer nanoseconds so lookups compare ints.
+                # The DirEntry caches its stat result, and Windows fills it
+                # in from the directory listing without another syscall.
+                file_stat = entry.stat()
 
-                # Extract metadata from filename
+                # Extract metadata from filename. One match gives the date
+                # and, for media, the ID the extract_* helpers would find.
+                keys = self.MEDIA_KEYS_PATTERN.match(filename)
                 file_metadata = {
-                    "original_path": str(file_path),
+                    "original_path": entry.path,
                     "filename": filename,
                     "type": file_type,
-                    "date": self.extract_date_from_filename(filename),
-                    "extension": file_path.suffix,
-                    "mtime": mtime,
+                    "date": keys["date"],
+                    "extension": os.path.splitext(filename)[1],
+                    "mtime_ns": file_stat.st_mtime_ns,
+                    "size": file_stat.st_size,
                 }
 
                 if file_type == "media":
-                    # Try to extract media ID, UUID, or hash
-                    media_id = self.extract_media_id(filename)
-                    if media_id:
-                        file_metadata["media_id"] = media_id
-                    else:
-                        uuid = self.extract_uuid(filename)
-                        if uuid:
-                            file_metadata["uuid"] = uuid
-                        else:
-                            hash_id = self.extract_hash(filename)
-                            if hash_id:
-                                file_metadata["hash"] = hash_id
+                    # Media ID, UUID, or hash, whichever matched first
+                    if keys["media_id"]:
+                        file_metadata["media_id"] = f"b~{keys['media_id']}"
+                    elif keys["uuid"]:
+                        file_metadata["uuid"] = keys["uuid"]
+                    elif keys["hash"]:
+                        file_metadata["hash"] = keys["hash"]
 
                 elif file_type == "overlay":
                     uuid = self.extract_uuid(filename)
@@ -428,21 +485,21 @@ class SnapchatPreprocessor:
 
     def build_media_overlay_maps(
         self, file_catalog: Dict
-    ) -> Tuple[Dict[str, str], Dict[str, str], Dict[float, List[str]]]:
+    ) -> Tuple[Dict[str, str], Dict[str, str], Dict[int, List[Tuple[str, str]]]]:
         """
         Build lookup maps for efficient media and overlay matching
 
         Returns: (media_id_to_filename, media_id_to_overlay, mtime_to_filenames)
             - media_id_to_filename: Maps media_id -> media filename
             - media_id_to_overlay: Maps media_id -> overlay filename (if exists)
-            - mtime_to_filenames: Maps modification time -> list of filenames (media and overlay)
+            - mtime_to_filenames: Maps modification time (ns) -> list of (filename, type) tuples (media and overlay)
         """
         media_id_to_filename = {}
         media_id_to_mtime = {}
         mtime_to_filenames = {}
 
         for filename, file_info in file_catalog.items():
-            mtime = file_info.get("mtime")
+            mtime = file_info.get("mtime_ns")
             if mtime is None:
                 continue
 
@@ -482,17 +539,57 @@ class SnapchatPreprocessor:
         Returns:
             Updated metadata dict with merged duplicates
         """
-        # Build map of media filename -> hash
+        # Only media some message (or orphaned entry) points at can be
+        # merged, so only those files need hashing
+        referenced_media = set()
+        for conv_data in metadata["conversations"].values():
+            for message in conv_data.get("messages", []):
+                if "media_file" in message:
+                    referenced_media.add(message["media_file"])
+                elif "media_files" in message:
+                    referenced_media.update(message["media_files"])
+        for message in metadata.get("orphaned_media", []):
+            if message.get("media_file"):
+                referenced_media.add(message["media_file"])
+
+        # Files of different sizes can't be duplicates. A referenced file
+        # whose size no other referenced file shares gets a size key instead
+        # of a hash, which still groups messages pointing at that one file.
+        referenced_by_size = {}
         media_hashes = {}
-        for filename, file_info in file_catalog.items():
-            if file_info["type"] == "media":
-                try:
-                    file_path = Path(file_info["original_path"])
-                    if file_path.exists():
-                        file_hash = self._compute_file_hash(file_path)
-                        media_hashes[filename] = file_hash
-                except Exception as e:
-                    logger.warning(f"Failed to compute hash for {filename}: {e}")
+        to_hash = set()
+        for filename in referenced_media:
+            file_info = file_catalog.get(filename)
+            if not file_info or file_info["type"] != "media":
+                continue
+            size = file_info.get("size")
+            if size is None:
+                to_hash.add(filename)
+            else:
+                referenced_by_size.setdefault(size, []).append(filename)
+        for size, filenames in referenced_by_size.items():
+            if len(filenames) > 1:
+                to_hash.update(filenames)
+            else:
+                media_hashes[filenames[0]] = f"size:{size}"
+
+        # Build map of media filename -> hash. Files are hashed on a thread
+        # pool (reads and xxhash updates release the GIL)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            hash_futures = {
+                filename: executor.submit(
+                    self._compute_file_hash, file_catalog[filename]["original_path"]
+                )
+                for filename in to_hash
+            }
+
+        for filename, future in hash_futures.items():
+            try:
+                media_hashes[filename] = future.result()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to compute hash for {filename}: {e}")
         
         # Track which messages belong to which hash
         # hash -> list of (conv_id, message_index, message_dict)
@@ -529,8 +626,8 @@ class SnapchatPreprocessor:
         
         # Identify duplicates (hash with multiple messages)
         duplicates_found = 0
-        messages_to_remove = {}  # conv_id -> list of message indices to remove
-        orphaned_to_remove = []  # list of orphaned media indices to remove
+        messages_to_remove = {}  # conv_id -> set of message indices to remove
+        orphaned_to_remove = set()  # orphaned media indices to remove
         
         for file_hash, message_list in hash_to_messages.items():
             if len(message_list) > 1:
@@ -584,11 +681,9 @@ class SnapchatPreprocessor:
                     # Mark for removal (except the oldest one)
                     if conv_id != oldest_conv_id or msg_idx != oldest_idx:
                         if conv_id is not None:
-                            if conv_id not in messages_to_remove:
-                                messages_to_remove[conv_id] = []
-                            messages_to_remove[conv_id].append(msg_idx)
+                            messages_to_remove.setdefault(conv_id, set()).add(msg_idx)
                         else:
-                            orphaned_to_remove.append(msg_idx)
+                            orphaned_to_remove.add(msg_idx)
                 
                 # Replace oldest message with merged version
                 if oldest_conv_id is not None:
@@ -606,17 +701,23 @@ class SnapchatPreprocessor:
                     f"Hash: {file_hash[:16]}..., Conversations: {', '.join(filter(None, conv_list))}"
                 )
         
-        # Remove duplicate message entries (in reverse order to maintain indices)
+        # Remove duplicate message entries, rebuilding each list in one pass
+        # rather than deleting entries one by one
         for conv_id, indices in messages_to_remove.items():
             conv_messages = metadata["conversations"][conv_id]["messages"]
-            for idx in sorted(indices, reverse=True):
-                del conv_messages[idx]
+            conv_messages[:] = [
+                message for idx, message in enumerate(conv_messages) if idx not in indices
+            ]
             # Update message count
             metadata["conversations"][conv_id]["message_count"] = len(conv_messages)
-        
+
         # Remove from orphaned media
-        for idx in sorted(orphaned_to_remove, reverse=True):
-            del orphaned_media[idx]
+        if orphaned_to_remove:
+            orphaned_media[:] = [
+                message
+                for idx, message in enumerate(orphaned_media)
+                if idx not in orphaned_to_remove
+            ]
         
         # Update statistics
         with self.stats_lock:
@@ -627,16 +728,23 @@ class SnapchatPreprocessor:
         
         return metadata
 
-    def create_metadata(self, chat_history: Dict, file_catalog: Dict) -> Tuple[Dict, List]:
+    def create_metadata(
+        self, conversations: Iterable[Tuple[str, List[Dict]]], file_catalog: Dict
+    ) -> Tuple[Dict, List]:
         """
         Create cleaned metadata structure
 
+        Args:
+            conversations: (conversation_id, messages) pairs, such as
+                           iter_conversations() or chat_history.items()
+            file_catalog: File catalog from build_file_catalog()
+
         Returns: Dict with conversations, messages, and file mappings
         """
         metadata = {
             "export_info": {
                 "export_path": str(self.export_path),
-                "export_username": self.extract_username(chat_history),
+                "export_username": self.extract_username(),
                 "processed_date": datetime.now().isoformat(),
             },
             "conversations": {},
@@ -653,7 +761,7 @@ class SnapchatPreprocessor:
         for filename, file_info in file_catalog.items():
             if file_info["type"] == "media" and "media_id" not in file_info:
                 # This is a UUID-based media file (no media_id in filename)
-                mtime = file_info.get("mtime")
+                mtime = file_info.get("mtime_ns")
                 if mtime:
                     if mtime not in timestamp_to_uuid_files:
                         timestamp_to_uuid_files[mtime] = []
@@ -667,7 +775,7 @@ class SnapchatPreprocessor:
         ambiguous_cases = []
 
         # Process each conversation
-        for conversation_id, messages in chat_history.items():
+        for conversation_id, messages in conversations:
             self.stats["conversations"] += 1
 
             conversation_type, conversation_title = self.classify_conversation(
@@ -712,20 +820,13 @@ class SnapchatPreprocessor:
                             orphaned_media_ids.append(media_id)
 
                     # Phase 2: Try to match UUID files by timestamp
-                    # Calculate message timestamp
+                    # Calculate message timestamp, in the same integer
+                    # nanoseconds as the catalog mtimes (used again below)
+                    message_timestamp = None
                     try:
                         date_str = message.get("Created", "")
                         if date_str:
-                            # Parse timestamp: "YYYY-MM-DD HH:MM:SS UTC"
-                            # Remove " UTC" suffix and parse as naive datetime
-                            date_str_no_tz = date_str.replace(" UTC", "")
-                            message_dt = datetime.strptime(
-                                date_str_no_tz, "%Y-%m-%d %H:%M:%S"
-                            )
-                            # Treat as UTC and convert to timestamp
-                            message_timestamp = message_dt.replace(
-                                tzinfo=timezone.utc
-                            ).timestamp()
+                            message_timestamp = self._message_timestamp_ns(date_str)
 
                             # Check for unmatched UUID files with this timestamp
                             if message_timestamp in timestamp_to_uuid_files:
@@ -768,16 +869,7 @@ class SnapchatPreprocessor:
                         # Get message timestamp for overlay lookup
                         try:
                             date_str = message.get("Created", "")
-                            if date_str:
-                                # Parse timestamp as UTC
-                                date_str_no_tz = date_str.replace(" UTC", "")
-                                message_dt = datetime.strptime(
-                                    date_str_no_tz, "%Y-%m-%d %H:%M:%S"
-                                )
-                                message_timestamp = message_dt.replace(
-                                    tzinfo=timezone.utc
-                                ).timestamp()
-
+                            if message_timestamp is not None:
                                 # Find all overlays with this timestamp
                                 overlays_at_timestamp = []
                                 if message_timestamp in mtime_to_filenames:
@@ -932,8 +1024,10 @@ class SnapchatPreprocessor:
             if file_info["type"] == "media" and filename not in matched_media_files:
                 # Use filesystem mtime for created date (format to match conversation messages)
                 created_date = None
-                if "mtime" in file_info:
-                    created_date = datetime.fromtimestamp(file_info["mtime"]).strftime(
+                if "mtime_ns" in file_info:
+                    created_date = datetime.fromtimestamp(
+                        file_info["mtime_ns"] / 1_000_000_000
+                    ).strftime(
                         "%Y-%m-%d %H:%M:%S UTC"
                     )
                 else:
@@ -953,7 +1047,7 @@ class SnapchatPreprocessor:
                 }
 
                 # Try to find matching overlay using mtime (only if unambiguous)
-                mtime = file_info.get("mtime")
+                mtime = file_info.get("mtime_ns")
                 overlay_found = False
                 if mtime and mtime in mtime_to_filenames:
                     # Count available overlays at this timestamp
@@ -991,7 +1085,7 @@ class SnapchatPreprocessor:
                         "media_id": media_id,
                         "overlay_status": overlay_status,
                         "date": file_info.get("date"),
-                        "mtime": file_info.get("mtime"),
+                        "mtime": mtime / 1_000_000_000 if mtime else None,
                         "has_overlay": overlay_found,
                     }
                 )
@@ -1021,16 +1115,6 @@ class SnapchatPreprocessor:
         for filename, file_info in file_catalog.items():
             source = Path(file_info["original_path"])
 
-            if not source.exists():
-                self.log_failure(
-                    "FILE_NOT_FOUND",
-                    filename,
-                    "File missing at source",
-                    f"expected at {source}",
-                )
-                print(f"WARNING: File not found: {source}")
-                continue
-
             # Determine destination
             if file_info["type"] == "media":
                 destination = self.media_dir / filename
@@ -1040,9 +1124,20 @@ class SnapchatPreprocessor:
                 continue
 
             try:
-                shutil.copy2(str(source), str(destination))
+                # Hard links are safe here: the export is left untouched and
+                # the processor copies these files again before modifying
+                # them. Across filesystems this falls back to a fast copy.
+                fast_copy(source, destination, allow_link=True)
                 # Update path in catalog
                 file_info["new_path"] = str(destination)
+            except FileNotFoundError:
+                self.log_failure(
+                    "FILE_NOT_FOUND",
+                    filename,
+                    "File missing at source",
+                    f"expected at {source}",
+                )
+                print(f"WARNING: File not found: {source}")
             except Exception as e:
                 self.log_failure(
                     "COPY_FAILED",
@@ -1109,8 +1204,8 @@ class SnapchatPreprocessor:
             # Write match_info.json
             match_info_path = case_dir / "match_info.json"
             try:
-                with open(match_info_path, "w", encoding="utf-8") as f:
-                    json.dump(case, f, indent=2, ensure_ascii=False)
+                with open(match_info_path, "wb") as f:
+                    f.write(json_utils.dumps(case, indent=True))
             except Exception as e:
                 print(f"ERROR: Failed to write {match_info_path}: {e}")
 
@@ -1121,8 +1216,8 @@ class SnapchatPreprocessor:
     def save_metadata(self, metadata: Dict) -> None:
         """Save cleaned metadata to metadata.json"""
         try:
-            with open(self.metadata_file, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            with open(self.metadata_file, "wb") as f:
+                f.write(json_utils.dumps(metadata, indent=True))
 
             logger.info(f"SUCCESS: Saved metadata to {self.metadata_file}")
         except Exception as e:
@@ -1163,16 +1258,15 @@ class SnapchatPreprocessor:
         if not self.validate_export():
             sys.exit(1)
 
-        # Load chat history
-        chat_history = self.load_chat_history()
-
         # Build file catalog
         print("\nScanning chat_media directory...")
         file_catalog = self.build_file_catalog()
 
         # Create cleaned metadata
         print("\nProcessing metadata...")
-        metadata, ambiguous_cases = self.create_metadata(chat_history, file_catalog)
+        metadata, ambiguous_cases = self.create_metadata(
+            self.iter_conversations(), file_catalog
+        )
 
         # Organize files
         self.organize_files(file_catalog)
@@ -16,6 +16,7 @@ from typing import Optional
 from common.dependency_checker import (
     check_exiftool,
     check_ffmpeg,
+    check_pillow,
     print_exiftool_error,
     print_ffmpeg_error,
 )
@@ -250,15 +251,6 @@ def _extract_username_from_dir(directory: str) -> str:
     return "unknown"
 
 
-def check_pillow():
-    """Check if PIL/Pillow is installed"""
-    try:
-        __import__("PIL")
-        return True
-    except ImportError:
-        return False
-
-
 def load_metadata(metadata_path: Path) -> dict:
     """Load and parse metadata.json
 
@@ -0,0 +1 @@
+# Tests for shared common modules
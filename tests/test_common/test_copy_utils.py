@@ -0,0 +1,242 @@
+"""
+Tests for the fast file copy helper.
+
+Tests cover:
+- Content and timestamp preservation
+- Hard link opt-in
+- Overwriting existing destinations
+- Same-file protection
+- Fallback from FICLONE to copy_file_range to sendfile to read/write
+- Short copies and extended attributes
+"""
+
+import errno
+import os
+import shutil
+import sys
+
+import pytest
+
+from common import copy_utils
+from common.copy_utils import fast_copy
+
+
+class TestFastCopy:
+    """Tests for fast_copy."""
+
+    def test_copies_content_and_mtime(self, tmp_path):
+        """Should copy bytes and preserve the source mtime."""
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"x" * 100_000)
+        os.utime(src, (1_600_000_000, 1_600_000_000))
+        dst = tmp_path / "dst.jpg"
+
+        fast_copy(src, dst)
+
+        assert dst.read_bytes() == src.read_bytes()
+        assert dst.stat().st_mtime == 1_600_000_000
+        assert not os.path.samefile(src, dst)
+
+    def test_overwrites_existing_destination(self, tmp_path):
+        """Should replace the contents of an existing destination."""
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"new")
+        dst = tmp_path / "dst.jpg"
+        dst.write_bytes(b"old contents that are longer")
+
+        fast_copy(src, dst)
+
+        assert dst.read_bytes() == b"new"
+
+    def test_allow_link_hard_links(self, tmp_path):
+        """Should hard link when allowed and possible."""
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"data")
+        dst = tmp_path / "dst.jpg"
+
+        fast_copy(src, dst, allow_link=True)
+
+        assert os.path.samefile(src, dst)
+
+    def test_existing_hard_link_is_not_truncated(self, tmp_path):
+        """Should refuse to copy a file onto a hard link of itself."""
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"data")
+        dst = tmp_path / "dst.jpg"
+        os.link(src, dst)
+
+        with pytest.raises(shutil.SameFileError):
+            fast_copy(src, dst)
+
+        assert src.read_bytes() == b"data"
+
+    def test_allow_link_existing_link_is_noop(self, tmp_path):
+        """Should treat an existing hard link to the source as already copied."""
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"data")
+        dst = tmp_path / "dst.jpg"
+
+        fast_copy(src, dst, allow_link=True)
+        fast_copy(src, dst, allow_link=True)
+
+        assert os.path.samefile(src, dst)
+        assert src.read_bytes() == b"data"
+
+    def test_allow_link_replaces_link_to_other_file(self, tmp_path):
+        """Should replace a destination hard-linked to another file, not write into it."""
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"new")
+        other = tmp_path / "other.jpg"
+        other.write_bytes(b"original export file")
+        dst = tmp_path / "dst.jpg"
+        os.link(other, dst)
+
+        fast_copy(src, dst, allow_link=True)
+
+        assert os.path.samefile(src, dst)
+        assert other.read_bytes() == b"original export file"
+
+    def test_allow_link_copy_fallback_keeps_other_file(self, tmp_path, monkeypatch):
+        """Should copy to a new inode when a linked destination can't be relinked."""
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"new")
+        other = tmp_path / "other.jpg"
+        other.write_bytes(b"original export file")
+        dst = tmp_path / "dst.jpg"
+        os.link(other, dst)
+
+        def no_link(src, dst):
+            raise OSError(errno.EXDEV, "cross-device link")
+
+        monkeypatch.setattr(copy_utils.os, "link", no_link)
+        fast_copy(src, dst, allow_link=True)
+
+        assert dst.read_bytes() == b"new"
+        assert not os.path.samefile(other, dst)
+        assert other.read_bytes() == b"original export file"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux descriptor copy path")
+class TestFastCopyFallbacks:
+    """Tests for the copy strategy fallback chain."""
+
+    @staticmethod
+    def _unsupported(*args, **kwargs):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    @pytest.mark.parametrize("disabled", [1, 2, 3])
+    def test_falls_back_when_unsupported(self, tmp_path, monkeypatch, disabled):
+        """Should still copy correctly when earlier strategies are unsupported."""
+        strategies = [
+            copy_utils._copy_with_ficlone,
+            copy_utils._copy_with_copy_file_range,
+            copy_utils._copy_with_sendfile,
+            copy_utils._copy_with_read_write,
+        ]
+        monkeypatch.setattr(
+            copy_utils,
+            "_COPY_STRATEGIES",
+            [self._unsupported] * disabled + strategies[disabled:],
+        )
+        src = tmp_path / "src.mp4"
+        data = os.urandom(3 * copy_utils.COPY_BUFSIZE + 17)
+        src.write_bytes(data)
+        os.chmod(src, 0o640)
+        dst = tmp_path / "dst.mp4"
+        dst.write_bytes(b"stale")
+
+        fast_copy(src, dst)
+
+        assert dst.read_bytes() == data
+        assert dst.stat().st_mode & 0o777 == 0o640
+
+    def test_zero_return_falls_back(self, tmp_path, monkeypatch):
+        """Should move to the next strategy when a kernel copy returns 0 early."""
+        monkeypatch.setattr(copy_utils.os, "copy_file_range", lambda *args: 0, raising=False)
+        monkeypatch.setattr(
+            copy_utils,
+            "_COPY_STRATEGIES",
+            [copy_utils._copy_with_copy_file_range, copy_utils._copy_with_read_write],
+        )
+        src = tmp_path / "src.mp4"
+        data = os.urandom(copy_utils.COPY_BUFSIZE + 17)
+        src.write_bytes(data)
+        dst = tmp_path / "dst.mp4"
+
+        fast_copy(src, dst)
+
+        assert dst.read_bytes() == data
+
+    def test_short_copy_raises(self, tmp_path, monkeypatch):
+        """Should fail rather than leave a truncated destination."""
+
+        def truncating(src_fd, dst_fd, size):
+            os.write(dst_fd, b"x")
+
+        monkeypatch.setattr(copy_utils, "_COPY_STRATEGIES", [truncating])
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"data")
+
+        with pytest.raises(OSError):
+            fast_copy(src, tmp_path / "dst.jpg")
+
+    def test_copies_xattrs(self, tmp_path):
+        """Should carry user extended attributes over like shutil.copy2."""
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"data")
+        try:
+            os.setxattr(src, "user.memoria", b"tagged")
+        except OSError:
+            pytest.skip("Filesystem does not support user xattrs")
+        dst = tmp_path / "dst.jpg"
+
+        fast_copy(src, dst)
+
+        assert os.getxattr(dst, "user.memoria") == b"tagged"
+
+    def test_other_errors_are_raised(self, tmp_path, monkeypatch):
+        """Should not mask errors that aren't "unsupported operation"."""
+
+        def failing(*args, **kwargs):
+            raise OSError(errno.EIO, "I/O error")
+
+        monkeypatch.setattr(copy_utils, "_COPY_STRATEGIES", [failing, copy_utils._copy_with_read_write])
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"data")
+
+        with pytest.raises(OSError):
+            fast_copy(src, tmp_path / "dst.jpg")
+
+
+class TestFastCopyPortablePaths:
+    """Tests for the non-Linux copy paths."""
+
+    @pytest.mark.parametrize("shutil_is_fast", [True, False], ids=["copy2", "buffered"])
+    def test_copies_content_and_mtime(self, tmp_path, monkeypatch, shutil_is_fast):
+        """Should copy bytes and preserve the mtime on every path."""
+        monkeypatch.setattr(copy_utils, "_USE_FD_COPY", False)
+        monkeypatch.setattr(copy_utils, "_SHUTIL_IS_FAST", shutil_is_fast)
+        src = tmp_path / "src.jpg"
+        data = os.urandom(copy_utils.COPY_BUFSIZE + 1)
+        src.write_bytes(data)
+        os.utime(src, (1_600_000_000, 1_600_000_000))
+        dst = tmp_path / "dst.jpg"
+
+        fast_copy(src, dst)
+
+        assert dst.read_bytes() == data
+        assert dst.stat().st_mtime == 1_600_000_000
+
+    def test_buffered_rejects_same_file(self, tmp_path, monkeypatch):
+        """Should not truncate a hard link to the source."""
+        monkeypatch.setattr(copy_utils, "_USE_FD_COPY", False)
+        monkeypatch.setattr(copy_utils, "_SHUTIL_IS_FAST", False)
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"data")
+        dst = tmp_path / "dst.jpg"
+        os.link(src, dst)
+
+        with pytest.raises(shutil.SameFileError):
+            fast_copy(src, dst)
+
+        assert src.read_bytes() == b"data"
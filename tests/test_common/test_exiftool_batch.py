@@ -0,0 +1,95 @@
+"""
+Tests for the persistent exiftool process used by the batch helpers.
+
+Tests cover:
+- The -stay_open request/response framing
+- Falling back to per-call exiftool when the session can't start
+
+A small stand-in script replaces exiftool on PATH, so these run without
+exiftool installed.
+"""
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+from common import exiftool_batch
+
+FAKE_EXIFTOOL = textwrap.dedent(
+    """\
+    #!{python}
+    import sys
+
+    args = []
+    for line in sys.stdin:
+        arg = line.rstrip("\\n")
+        if arg.startswith("-execute"):
+            print("ran " + " ".join(args))
+            print("{{ready" + arg[len("-execute"):] + "}}", flush=True)
+            args = []
+        elif args == ["-stay_open"] and arg == "False":
+            break
+        else:
+            args.append(arg)
+    """
+)
+
+
+@pytest.fixture
+def fake_exiftool(tmp_path, monkeypatch):
+    """Put a stay_open-speaking exiftool stand-in first on PATH."""
+    script = tmp_path / "exiftool"
+    script.write_text(FAKE_EXIFTOOL.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    yield
+    exiftool_batch.stop_exiftool_session()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a shebang script")
+class TestExiftoolProcess:
+    """Tests for ExiftoolProcess and the session helpers."""
+
+    def test_execute_many_returns_output_per_command(self, fake_exiftool):
+        """Should frame each command's output by its ready marker."""
+        proc = exiftool_batch.ExiftoolProcess()
+        try:
+            assert proc.execute_many([["-a", "x.jpg"], ["-b", "y.jpg"]]) == [
+                "ran -a x.jpg\n",
+                "ran -b y.jpg\n",
+            ]
+            # Numbering continues across calls
+            assert proc.execute(["-c"]) == "ran -c\n"
+        finally:
+            proc.close()
+
+    def test_large_payload_does_not_deadlock(self, fake_exiftool):
+        """Should stream long command lists while reading output."""
+        proc = exiftool_batch.ExiftoolProcess()
+        try:
+            commands = [["-overwrite_original", "x" * 200, f"{i}.jpg"] for i in range(2000)]
+            assert len(proc.execute_many(commands)) == 2000
+        finally:
+            proc.close()
+
+    def test_helpers_use_session(self, fake_exiftool):
+        """Should route helper calls through the persistent process."""
+        assert exiftool_batch.start_exiftool_session()
+        assert exiftool_batch._run_exiftool(["-validate", "a.jpg"]) == "ran -validate a.jpg\n"
+
+    def test_lazy_session_starts_on_first_use(self, fake_exiftool):
+        """Should not start exiftool until a helper needs it."""
+        assert exiftool_batch.start_exiftool_session(lazy=True)
+        assert exiftool_batch._session is None
+
+        assert exiftool_batch._run_exiftool(["-ver"]) == "ran -ver\n"
+        assert exiftool_batch._session is not None
+
+    def test_start_without_exiftool(self, tmp_path, monkeypatch):
+        """Should report failure and leave the per-call path in place."""
+        monkeypatch.setenv("PATH", str(tmp_path))
+        assert not exiftool_batch.start_exiftool_session()
+        assert exiftool_batch._session is None
+        assert not exiftool_batch._session_enabled
@@ -0,0 +1,37 @@
+"""
+Tests for the banned files filter.
+
+Tests cover:
+- Exact and prefix pattern matches
+- Adding and removing patterns
+"""
+
+from pathlib import Path
+
+from common.filter_banned_files import BannedFilesFilter
+
+
+class TestBannedFilesFilter:
+    """Tests for BannedFilesFilter."""
+
+    def test_exact_and_prefix_matches(self):
+        """Should match patterns exactly or as name prefixes."""
+        banned_filter = BannedFilesFilter()
+
+        assert banned_filter.is_banned_name(".DS_Store")
+        assert banned_filter.is_banned_name("._photo.jpg")
+        assert banned_filter.is_banned_name("SYNOFILE_THUMB_XL.jpg")
+        assert banned_filter.is_banned(Path("/export/@eaDir"))
+        assert not banned_filter.is_banned_name("photo.jpg")
+        assert not banned_filter.is_banned(Path("/export/._dir/photo.jpg"))
+
+    def test_pattern_changes_apply(self):
+        """Should reflect added and removed patterns immediately."""
+        banned_filter = BannedFilesFilter(additional_patterns=["tmp_"])
+        assert banned_filter.is_banned_name("tmp_file.jpg")
+
+        banned_filter.remove_pattern("tmp_")
+        banned_filter.add_pattern("cache")
+
+        assert not banned_filter.is_banned_name("tmp_file.jpg")
+        assert banned_filter.is_banned_name("cache")
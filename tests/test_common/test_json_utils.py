@@ -0,0 +1,128 @@
+"""
+Tests for the JSON serialization helpers.
+
+Tests cover:
+- Round-tripping with orjson and the stdlib fallback
+- Unescaped non-ASCII output
+- Streaming reads with ijson and the full-load fallback
+"""
+
+import json
+
+import pytest
+
+from common import json_utils
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Run each test with orjson (when installed) and the stdlib fallback."""
+    if request.param and not json_utils.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(json_utils, "HAS_ORJSON", request.param)
+    return request.param
+
+
+class TestJsonUtils:
+    """Tests for dumps/loads."""
+
+    def test_round_trip(self, backend):
+        """Should round-trip nested structures."""
+        obj = {"caption": "café ☕", "media_files": ["a.jpg"], "latitude": 1.5, "x": None}
+        assert json_utils.loads(json_utils.dumps(obj)) == obj
+
+    def test_non_ascii_unescaped(self, backend):
+        """Should emit UTF-8 instead of \\u escapes."""
+        assert "café".encode("utf-8") in json_utils.dumps({"c": "café"})
+
+    def test_indent_is_valid_json(self, backend):
+        """Should produce indented output readable by the stdlib."""
+        data = json_utils.dumps({"a": [1, 2]}, indent=True)
+        assert b"\n  " in data
+        assert json.loads(data) == {"a": [1, 2]}
+
+    def test_invalid_json_raises_value_error(self, backend):
+        """Should raise a ValueError subclass on malformed input."""
+        with pytest.raises(ValueError):
+            json_utils.loads(b"{not json")
+
+
+@pytest.fixture(params=[True, False], ids=["ijson", "full-load"])
+def stream_backend(request, monkeypatch):
+    """Run each test with ijson (when installed) and the full-load fallback."""
+    if request.param and not json_utils.HAS_IJSON:
+        pytest.skip("ijson not installed")
+    monkeypatch.setattr(json_utils, "HAS_IJSON", request.param)
+    return request.param
+
+
+class TestJsonStreaming:
+    """Tests for iter_array/iter_items/validate_object/load_key."""
+
+    DOC = {
+        "export_info": {"export_name": "instagram-user-2025-01-01"},
+        "media": [{"caption": "café", "latitude": 1.5}, {"caption": None, "latitude": None}],
+    }
+
+    def _write(self, tmp_path):
+        path = tmp_path / "metadata.json"
+        path.write_bytes(json_utils.dumps(self.DOC))
+        return path
+
+    def test_iter_array(self, tmp_path, stream_backend):
+        """Should yield every array item with floats as floats."""
+        items = list(json_utils.iter_array(self._write(tmp_path), "media"))
+        assert items == self.DOC["media"]
+        assert isinstance(items[0]["latitude"], float)
+
+    def test_iter_array_root(self, tmp_path, stream_backend):
+        """Should yield the items of a root array when no key is given."""
+        path = tmp_path / "memories.json"
+        path.write_bytes(json_utils.dumps(self.DOC["media"]))
+        assert list(json_utils.iter_array(path)) == self.DOC["media"]
+
+    def test_iter_array_truncated(self, tmp_path, stream_backend):
+        """Should raise ValueError for a truncated array."""
+        path = tmp_path / "memories.json"
+        path.write_bytes(b'[{"caption": "a"}, {"capt')
+        with pytest.raises(ValueError):
+            list(json_utils.iter_array(path))
+
+    def test_iter_items(self, tmp_path, stream_backend):
+        """Should yield each top-level key and value in order."""
+        assert list(json_utils.iter_items(self._write(tmp_path))) == list(self.DOC.items())
+
+        path = tmp_path / "broken.json"
+        path.write_bytes(b'{"a": [1, ')
+        with pytest.raises(ValueError):
+            list(json_utils.iter_items(path))
+
+    def test_validate_object(self, tmp_path, stream_backend):
+        """Should accept an object document and reject broken or non-object ones."""
+        json_utils.validate_object(self._write(tmp_path))
+
+        path = tmp_path / "other.json"
+        for data in (b'{"a": [1, ', b"[1, 2]"):
+            path.write_bytes(data)
+            with pytest.raises(ValueError):
+                json_utils.validate_object(path)
+
+    def test_load_key(self, tmp_path, stream_backend):
+        """Should read a single top-level value or return the default."""
+        path = self._write(tmp_path)
+        assert json_utils.load_key(path, "export_info") == self.DOC["export_info"]
+        assert json_utils.load_key(path, "missing", {}) == {}
+
+    def test_load_first_item(self, tmp_path, stream_backend):
+        """Should return the first array item, or None for other roots."""
+        path = tmp_path / "memories.json"
+        path.write_bytes(json_utils.dumps(self.DOC["media"]))
+        assert json_utils.load_first_item(path) == self.DOC["media"][0]
+
+        path.write_bytes(b"[]")
+        assert json_utils.load_first_item(path) is None
+        assert json_utils.load_first_item(self._write(tmp_path)) is None
+
+        path.write_bytes(b"[{")
+        with pytest.raises(ValueError):
+            json_utils.load_first_item(path)
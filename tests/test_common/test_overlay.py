@@ -0,0 +1,40 @@
+"""
+Tests for image overlay compositing.
+
+Tests cover:
+- The opaque-base JPEG fast path matching the alpha_composite result
+"""
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from common.overlay import create_image_with_overlay  # noqa: E402
+
+
+class TestCreateImageWithOverlay:
+    """Tests for create_image_with_overlay."""
+
+    def test_opaque_jpeg_matches_alpha_composite(self, tmp_path):
+        """Should produce the same pixels as compositing and flattening."""
+        base_path = tmp_path / "base.jpg"
+        overlay_path = tmp_path / "overlay.png"
+        Image.linear_gradient("L").convert("RGB").save(base_path)
+        overlay = Image.new("RGBA", (64, 64), (255, 0, 0, 128))
+        overlay.paste((0, 0, 255, 0), (0, 0, 32, 64))
+        overlay.save(overlay_path)
+
+        output_path = tmp_path / "out.jpg"
+        assert create_image_with_overlay(base_path, overlay_path, output_path)
+
+        with Image.open(base_path) as base:
+            composite = Image.alpha_composite(
+                base.convert("RGBA"), overlay.resize(base.size, Image.Resampling.LANCZOS)
+            )
+        expected = Image.new("RGB", composite.size, (255, 255, 255))
+        expected.paste(composite, mask=composite.split()[-1])
+        expected_path = tmp_path / "expected.jpg"
+        expected.save(expected_path, quality=95, optimize=True)
+
+        with Image.open(output_path) as out, Image.open(expected_path) as ref:
+            assert out.tobytes() == ref.tobytes()
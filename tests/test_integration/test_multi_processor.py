@@ -200,3 +200,85 @@ class TestProcessorCount:
             assert isinstance(priority, int)
             assert 1 <= priority <= 100
 
+
+class TestDetectionFreshness:
+    """Tests that detection reflects the current state of the export."""
+
+    def test_detect_all_sees_nested_changes(self, temp_export_dir):
+        """Should re-detect after files change below the export directory."""
+        from processors.base import ProcessorBase
+        from processors.registry import ProcessorRegistry
+
+        marker = temp_export_dir / "media" / "marker.json"
+        marker.parent.mkdir()
+
+        class MarkerProcessor(ProcessorBase):
+            @staticmethod
+            def detect(input_path):
+                return (input_path / "media" / "marker.json").exists()
+
+            @staticmethod
+            def get_name():
+                return "Marker"
+
+            @staticmethod
+            def get_priority():
+                return 0
+
+            @staticmethod
+            def process(input_dir, output_dir=None, **kwargs):
+                return True
+
+        registry = ProcessorRegistry()
+        registry.register(MarkerProcessor)
+
+        assert registry.detect_all(temp_export_dir) == []
+        # Only the subdirectory changes; the export directory's mtime doesn't
+        marker.write_text("{}")
+        assert registry.detect_all(temp_export_dir) == [MarkerProcessor]
+
+
+class TestRegistryOrdering:
+    """Tests for priority ordering and name lookup in the registry."""
+
+    @staticmethod
+    def _make_processor(name, priority):
+        from processors.base import ProcessorBase
+
+        class StubProcessor(ProcessorBase):
+            @staticmethod
+            def detect(input_path):
+                return True
+
+            @staticmethod
+            def get_name():
+                return name
+
+            @staticmethod
+            def get_priority():
+                return priority
+
+            @staticmethod
+            def process(input_dir, output_dir=None, **kwargs):
+                return True
+
+        return StubProcessor
+
+    def test_registration_keeps_priority_order(self, temp_export_dir):
+        """Should order by priority, keeping registration order on ties."""
+        from processors.registry import ProcessorRegistry
+
+        low = self._make_processor("Low", 10)
+        high = self._make_processor("High", 90)
+        mid_first = self._make_processor("Mid A", 50)
+        mid_second = self._make_processor("Mid B", 50)
+
+        registry = ProcessorRegistry()
+        for processor in (low, mid_first, high, mid_second):
+            registry.register(processor)
+
+        expected = [high, mid_first, mid_second, low]
+        assert registry.get_all_processors() == expected
+        assert registry.detect_all(temp_export_dir) == expected
+        assert registry.get_by_name("mid b") is mid_second
+        assert registry.get_by_name("missing") is None
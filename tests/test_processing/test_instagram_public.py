@@ -10,6 +10,7 @@ Tests cover edge cases including:
 
 import json
 
+import pytest
 
 from tests.fixtures.generators import create_instagram_public_export
 from tests.fixtures.media_samples import write_media_file
@@ -199,3 +200,180 @@ class TestInstagramPublicFileTypes:
 
         assert (posts_dir / "video.mp4").exists()
 
+
+class TestInstagramPublicHtmlParsing:
+    """Tests for HTML metadata parsing in the preprocessor."""
+
+    CONTAINER = '<div class="pam _3-95 _2ph- _a6-g uiBoxWhite noborder">{}</div>'
+
+    def _parse(self, temp_export_dir, body):
+        from processors.instagram_public_media.preprocess import InstagramPreprocessor
+
+        html_path = temp_export_dir / "posts_1.html"
+        html_path.write_text(f"<html><body>{body}</body></html>", encoding="utf-8")
+        preprocessor = InstagramPreprocessor(temp_export_dir, workers=1)
+        return preprocessor.parse_html_file(html_path, "posts")
+
+    def test_plain_caption_and_timestamp(self, temp_export_dir):
+        """Should read caption and timestamp, unescaping entities."""
+        body = self.CONTAINER.format(
+            '<h2 class="_3-95 _2pim _a6-h _a6-i">Fish &amp; chips</h2>'
+            '<a href="media/posts/202210/1.jpg">x</a>'
+            '<div class="_3-94 _a6-o">Oct 02, 2022 5:58 pm</div>'
+        )
+        posts = self._parse(temp_export_dir, body)
+
+        assert len(posts) == 1
+        assert posts[0]["caption"] == "Fish & chips"
+        assert posts[0]["timestamp"] == "2022-10-02 17:58:00"
+        assert posts[0]["media_paths"] == ["media/posts/202210/1.jpg"]
+
+    def test_legacy_div_caption_and_timestamp(self, temp_export_dir):
+        """Should handle the legacy <div> caption and comma timestamp."""
+        body = self.CONTAINER.format(
+            '<div class="_3-95 _2pim _a6-h _a6-i">Legacy</div>'
+            '<div class="_3-94 _a6-o">Oct 02, 2022, 5:58 PM</div>'
+        )
+        posts = self._parse(temp_export_dir, body)
+
+        assert posts[0]["caption"] == "Legacy"
+        assert posts[0]["timestamp"] == "2022-10-02 17:58:00"
+
+    def test_caption_with_markup(self, temp_export_dir):
+        """Should fall back to the parsed tree for captions with nested tags."""
+        body = self.CONTAINER.format(
+            '<h2 class="_3-95 _2pim _a6-h _a6-i">Hello <b>world</b></h2>'
+        )
+        posts = self._parse(temp_export_dir, body)
+
+        assert posts[0]["caption"] == "Helloworld"
+        assert posts[0]["timestamp"] is None
+
+    def test_container_without_media(self, temp_export_dir):
+        """Should still emit posts that reference no media files."""
+        body = self.CONTAINER.format(
+            '<h2 class="_3-95 _2pim _a6-h _a6-i">Text only</h2>'
+            '<div class="_3-94 _a6-o">Oct 02, 2022 5:58 pm</div>'
+        ) + self.CONTAINER.format('<a href="media/posts/202210/2.jpg">x</a>')
+        posts = self._parse(temp_export_dir, body)
+
+        assert len(posts) == 2
+        assert posts[0]["caption"] == "Text only"
+        assert posts[0]["media_paths"] == []
+        assert posts[1]["media_paths"] == ["media/posts/202210/2.jpg"]
+
+
+class TestInstagramPublicMetadataFormats:
+    """Tests for the preprocessor's metadata output formats."""
+
+    POSTS = [
+        {"media_type": "posts", "caption": "Café ☕", "media_paths": ["media/a.jpg"]},
+        {"media_type": "reels", "caption": None, "media_paths": []},
+    ]
+
+    def _save(self, temp_export_dir, temp_output_dir, metadata_format):
+        from processors.instagram_public_media.preprocess import InstagramPreprocessor
+
+        preprocessor = InstagramPreprocessor(
+            temp_export_dir, temp_output_dir, workers=1, metadata_format=metadata_format
+        )
+        preprocessor.save_metadata(self.POSTS)
+        return temp_output_dir
+
+    def test_json_format_writes_jsonl_only(self, temp_export_dir, temp_output_dir):
+        out = self._save(temp_export_dir, temp_output_dir, "json")
+
+        lines = (out / "metadata.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == self.POSTS
+        assert not (out / "metadata.msgpack").exists()
+
+    def test_other_formats_are_removed(self, temp_export_dir, temp_output_dir):
+        """Should not leave an older metadata file that could shadow the new one."""
+        for name in ("metadata.msgpack", "metadata.json"):
+            (temp_output_dir / name).write_bytes(b"stale")
+
+        out = self._save(temp_export_dir, temp_output_dir, "json")
+
+        assert (out / "metadata.jsonl").exists()
+        assert not (out / "metadata.msgpack").exists()
+        assert not (out / "metadata.json").exists()
+
+    def test_both_formats_round_trip(self, temp_export_dir, temp_output_dir):
+        pytest.importorskip("msgpack")
+        from processors.instagram_public_media.processor import _iter_metadata_msgpack
+
+        out = self._save(temp_export_dir, temp_output_dir, "both")
+
+        assert (out / "metadata.jsonl").exists()
+        assert list(_iter_metadata_msgpack(out / "metadata.msgpack")) == self.POSTS
+
+
+class TestInstagramPublicFilenames:
+    """Tests for output filename generation."""
+
+    def test_sequence_per_date_type_and_extension(self):
+        from processors.instagram_public_media.processor import generate_unique_filename
+
+        counters = {}
+        post = {"timestamp": "2022-10-02 17:58:00"}
+        names = [
+            generate_unique_filename(post, "posts", "user", ".jpg", counters),
+            generate_unique_filename(post, "posts", "user", ".jpg", counters),
+            generate_unique_filename(post, "posts", "user", ".mp4", counters),
+            generate_unique_filename(post, "reels", "user", ".jpg", counters),
+            generate_unique_filename({"timestamp": None}, "posts", "user", ".jpg", counters),
+        ]
+
+        assert names == [
+            "insta-posts-user-20221002.jpg",
+            "insta-posts-user-20221002_1.jpg",
+            "insta-posts-user-20221002.mp4",
+            "insta-reels-user-20221002.jpg",
+            "insta-posts-user-00000000.jpg",
+        ]
+
+    def test_timestamp_ns_matches_local_time(self):
+        from datetime import datetime
+
+        from processors.instagram_public_media.processor import _timestamp_ns
+
+        expected = datetime(2022, 10, 2, 17, 58).timestamp()
+        assert _timestamp_ns("2022-10-02 17:58:00") == int(expected) * 1_000_000_000
+        assert _timestamp_ns("not a date") is None
+        assert _timestamp_ns(None) is None
+
+
+class TestInstagramPublicMediaBatch:
+    """Tests for per-batch result counting in the media worker."""
+
+    def test_counts_with_missing_source(self, tmp_path):
+        from multiprocessing import shared_memory
+
+        from common import exiftool_batch, json_utils
+        from processors.instagram_public_media import processor
+
+        src_dir = tmp_path / "media"
+        out_dir = tmp_path / "out"
+        src_dir.mkdir()
+        (out_dir / "posts").mkdir(parents=True)
+        (src_dir / "a.jpg").write_bytes(b"a")
+        (src_dir / "b.jpg").write_bytes(b"b")
+
+        blob = json_utils.dumps([{"timestamp": "2022-10-02 17:58:00", "caption": ""}])
+        shm = shared_memory.SharedMemory(create=True, size=len(blob))
+        try:
+            shm.buf[: len(blob)] = blob
+            processor._init_media_worker(
+                shm.name, len(blob), "user", str(src_dir), str(out_dir)
+            )
+            batch = [
+                (0, name, name, "posts", None)
+                for name in ("a.jpg", "missing.jpg", "b.jpg")
+            ]
+
+            assert processor.process_media_batch(batch) == (2, 1, 0)
+            assert (out_dir / "posts" / "b.jpg").read_bytes() == b"b"
+        finally:
+            shm.close()
+            shm.unlink()
+            exiftool_batch.stop_exiftool_session()
@@ -11,6 +11,7 @@ Tests cover edge cases including:
 """
 
 import json
+import os
 
 
 from tests.fixtures.generators import create_snapchat_memories_export
@@ -248,3 +249,121 @@ class TestSnapchatMemoriesConsolidated:
         assert (memories_dir / "media" / "photo.jpg").exists()
         assert (memories_dir / "metadata.json").exists()
 
+
+class TestSnapchatMemoriesDates:
+    """Tests for parsing memory dates once per memory."""
+
+    def test_filename_date_key_and_sequence(self):
+        """Should number names per date and extension, starting at _2."""
+        from processors.snapchat_memories.processor import generate_unique_filename
+
+        counters = {}
+        memory = {"date": "2021-01-04 23:08:30 UTC"}
+        names = [
+            generate_unique_filename(memory, "user", ".jpg", counters),
+            generate_unique_filename(memory, "user", ".jpg", counters),
+            generate_unique_filename(memory, "user", ".mp4", counters),
+            generate_unique_filename(memory, "user", ".jpg", counters),
+        ]
+
+        assert names == [
+            "snap-memories-user-20210104.jpg",
+            "snap-memories-user-20210104_2.jpg",
+            "snap-memories-user-20210104.mp4",
+            "snap-memories-user-20210104_3.jpg",
+        ]
+
+    def test_timestamp_ns_matches_local_time(self):
+        """Should read the date as local time, like update_file_timestamps."""
+        from datetime import datetime
+
+        from processors.snapchat_memories.processor import _timestamp_ns
+
+        expected = datetime(2021, 1, 4, 23, 8, 30).timestamp()
+        assert _timestamp_ns("2021-01-04 23:08:30 UTC") == int(expected) * 1_000_000_000
+        assert _timestamp_ns("not a date") is None
+        assert _timestamp_ns(None) is None
+
+
+class TestSnapchatMemoriesWorker:
+    """Tests for the file creation worker."""
+
+    def test_copy_and_missing_media(self, tmp_path):
+        """Should report results by task index without echoing the memory."""
+        from processors.snapchat_memories import processor
+
+        raw_dir = tmp_path / "raw"
+        out_dir = tmp_path / "out"
+        (raw_dir / "media").mkdir(parents=True)
+        out_dir.mkdir()
+        (raw_dir / "media" / "a.jpg").write_bytes(b"a")
+        os.utime(raw_dir / "media" / "a.jpg", (1_500_000_000, 1_500_000_000))
+        processor._init_memory_worker(str(raw_dir), out_dir, "user")
+
+        copied = processor.create_memory_file(
+            (0, {"media_filename": "a.jpg"}, "out.jpg", 1_600_000_000 * 1_000_000_000)
+        )
+        missing = processor.create_memory_file((1, {"media_filename": "b.jpg"}, "b.jpg", None))
+
+        assert copied == (0, True, str(out_dir / "out.jpg"), False, None)
+        # Copies keep the source mtime until Phase 3 sets the date
+        assert (out_dir / "out.jpg").stat().st_mtime == 1_500_000_000
+        assert missing == (1, False, None, False, str(raw_dir / "media" / "b.jpg"))
+
+    def test_exif_shard_sets_dates_after_write(self, tmp_path, monkeypatch):
+        """Should set file times to the memory date even if exiftool skips a file."""
+        from processors.snapchat_memories import processor
+
+        monkeypatch.setattr(processor, "batch_validate_exif", lambda paths: set())
+        monkeypatch.setattr(processor, "batch_read_existing_metadata", lambda paths: {})
+        monkeypatch.setattr(
+            processor,
+            "batch_write_metadata_snapchat_memories",
+            lambda file_info, existing: None,
+        )
+        path = tmp_path / "a.jpg"
+        path.write_bytes(b"a")
+        date = "2021-01-04 23:08:30 UTC"
+
+        assert processor.process_exif_shard([(str(path), {"date": date}, "user")]) == (1, 0)
+
+        expected_ns = processor._timestamp_ns(date)
+        assert path.stat().st_mtime_ns == expected_ns
+        assert path.stat().st_atime_ns == expected_ns
+
+    def test_repeated_video_overlay_is_encoded_once(self, tmp_path, monkeypatch):
+        """Should retag the first MKV for a repeated video and overlay."""
+        from processors.snapchat_memories import processor
+
+        raw_dir = tmp_path / "raw"
+        out_dir = tmp_path / "out"
+        (raw_dir / "media").mkdir(parents=True)
+        (raw_dir / "overlays").mkdir()
+        out_dir.mkdir()
+        for name in ("a.mp4", "b.mp4"):
+            (raw_dir / "media" / name).write_bytes(b"video")
+            (raw_dir / "overlays" / name.replace(".mp4", ".png")).write_bytes(b"png")
+        processor._init_memory_worker(str(raw_dir), out_dir, "user")
+
+        encodes, retags = [], []
+
+        def fake_encode(media_path, overlay_path, output_path, memory, export_username):
+            encodes.append(media_path.name)
+            output_path.write_bytes(b"mkv")
+            return True
+
+        def fake_retag(source_path, output_path, memory, export_username):
+            retags.append((source_path.name, output_path.name))
+            output_path.write_bytes(source_path.read_bytes())
+            return True
+
+        monkeypatch.setattr(processor, "create_video_with_overlay", fake_encode)
+        monkeypatch.setattr(processor, "retag_video_with_overlay", fake_retag)
+
+        for index, name in enumerate(("a", "b")):
+            memory = {"media_filename": f"{name}.mp4", "overlay_filename": f"{name}.png"}
+            result = processor.create_memory_file((index, memory, f"{name}.mp4", None))
+            assert result == (index, True, str(out_dir / f"{name}.mkv"), True, None)
+
+        assert encodes == ["a.mp4"]
+        assert retags == [("a.mkv", "b.mkv")]
@@ -10,6 +10,8 @@ Tests cover edge cases including:
 
 import json
 
+import pytest
+
 
 from tests.fixtures.generators import create_snapchat_messages_export
 from tests.fixtures.media_samples import write_media_file
@@ -127,6 +129,44 @@ class TestSnapchatMessagesOverlays:
         assert (media_dir / "2021-01-01_video.mp4").exists()
         assert (overlays_dir / "2021-01-01_overlay.png").exists()
 
+    def test_mtime_matching_uses_integer_nanoseconds(self, tmp_path):
+        """Should match UUID media and overlays to a message by exact file mtime."""
+        import os
+
+        from processors.snapchat_messages.preprocess import SnapchatPreprocessor
+
+        chat_media = tmp_path / "chat_media"
+        chat_media.mkdir()
+        uuid = "0A1B2C3D-0000-1111-2222-33334444555"
+        media_name = f"2021-01-01_media~zip-{uuid}5.mp4"
+        overlay_name = f"2021-01-01_overlay~zip-{uuid}6.png"
+        message_ns = SnapchatPreprocessor._message_timestamp_ns("2021-01-01 12:00:00 UTC")
+        for name in (media_name, overlay_name):
+            (chat_media / name).write_bytes(name.encode())
+            os.utime(chat_media / name, ns=(message_ns, message_ns))
+
+        preprocessor = SnapchatPreprocessor(tmp_path, username_override="me")
+        file_catalog = preprocessor.build_file_catalog()
+        assert file_catalog[media_name]["mtime_ns"] == message_ns
+
+        chat_history = {
+            "friend": [
+                {
+                    "From": "friend",
+                    "Media Type": "VIDEO",
+                    "Created": "2021-01-01 12:00:00 UTC",
+                    "Media IDs": "b~gone",
+                    "IsSender": False,
+                    "Content": "",
+                }
+            ]
+        }
+        metadata, _ = preprocessor.create_metadata(chat_history.items(), file_catalog)
+
+        message = metadata["conversations"]["friend"]["messages"][0]
+        assert message["media_file"] == media_name
+        assert message["overlay_file"] == overlay_name
+
 
 class TestSnapchatMessagesAmbiguousCases:
     """Tests for ambiguous matching scenarios."""
@@ -253,3 +293,217 @@ class TestSnapchatMessagesConversationTypes:
         metadata = json.loads((temp_export_dir / "metadata.json").read_text())
         assert metadata["conversations"]["group_abc"]["type"] == "group"
 
+
+class TestSnapchatMessagesDeduplication:
+    """Tests for merging identical media across conversations."""
+
+    def test_identical_media_merged(self, tmp_path):
+        """Should hash catalog media and merge messages sharing content."""
+        from processors.snapchat_messages.preprocess import SnapchatPreprocessor
+
+        media_dir = tmp_path / "chat_media"
+        media_dir.mkdir()
+        for name, content in (("a.jpg", b"same"), ("b.jpg", b"same"), ("c.jpg", b"other")):
+            (media_dir / name).write_bytes(content)
+
+        file_catalog = {
+            name: {"type": "media", "original_path": str(media_dir / name)}
+            for name in ("a.jpg", "b.jpg", "c.jpg", "missing.jpg")
+        }
+        metadata = {
+            "conversations": {
+                conv_id: {
+                    "messages": [
+                        {"conversation_id": conv_id, "created": created, "media_file": name}
+                    ]
+                }
+                for conv_id, created, name in (
+                    ("dm1", "2021-01-02 00:00:00 UTC", "a.jpg"),
+                    ("dm2", "2021-01-01 00:00:00 UTC", "b.jpg"),
+                    ("dm3", "2021-01-03 00:00:00 UTC", "c.jpg"),
+                )
+            }
+        }
+
+        preprocessor = SnapchatPreprocessor(tmp_path, workers=2)
+        result = preprocessor._deduplicate_media_messages(metadata, file_catalog)
+
+        conversations = result["conversations"]
+        assert conversations["dm1"]["messages"] == []
+        merged = conversations["dm2"]["messages"][0]
+        assert merged["media_file"] == "b.jpg"
+        assert [m["conversation_id"] for m in merged["messages"]] == ["dm2", "dm1"]
+        assert conversations["dm3"]["messages"][0]["media_file"] == "c.jpg"
+        assert preprocessor.stats["duplicate_files"] == 1
+
+    def test_message_with_two_duplicated_media_removed_once(self, tmp_path):
+        """Should drop a message once even when several of its files repeat."""
+        from processors.snapchat_messages.preprocess import SnapchatPreprocessor
+
+        media_dir = tmp_path / "chat_media"
+        media_dir.mkdir()
+        for name, content in (("a.jpg", b"1"), ("b.jpg", b"2"), ("c.jpg", b"1"), ("d.jpg", b"2")):
+            (media_dir / name).write_bytes(content)
+        file_catalog = {
+            name: {"type": "media", "original_path": str(media_dir / name)}
+            for name in ("a.jpg", "b.jpg", "c.jpg", "d.jpg")
+        }
+        metadata = {
+            "conversations": {
+                "dm1": {
+                    "messages": [
+                        {"created": "2021-01-01 00:00:00 UTC", "media_file": "a.jpg"},
+                        {"created": "2021-01-01 00:00:00 UTC", "media_file": "b.jpg"},
+                    ]
+                },
+                "dm2": {
+                    "messages": [
+                        {"created": "2021-01-02 00:00:00 UTC", "media_files": ["c.jpg", "d.jpg"]},
+                        {"created": "2021-01-03 00:00:00 UTC", "content": "kept"},
+                    ]
+                },
+            }
+        }
+
+        preprocessor = SnapchatPreprocessor(tmp_path)
+        result = preprocessor._deduplicate_media_messages(metadata, file_catalog)
+
+        assert result["conversations"]["dm2"]["messages"] == [
+            {"created": "2021-01-03 00:00:00 UTC", "content": "kept"}
+        ]
+        assert result["conversations"]["dm2"]["message_count"] == 1
+
+    def test_only_referenced_media_hashed(self, tmp_path, monkeypatch):
+        """Should skip hashing catalog media no message refers to."""
+        from processors.snapchat_messages.preprocess import SnapchatPreprocessor
+
+        hashed = []
+        monkeypatch.setattr(
+            SnapchatPreprocessor,
+            "_compute_file_hash",
+            lambda self, path: hashed.append(str(path)) or "h",
+        )
+        file_catalog = {
+            name: {"type": "media", "original_path": str(tmp_path / name)}
+            for name in ("a.jpg", "b.jpg", "unused.jpg")
+        }
+        metadata = {
+            "conversations": {"dm1": {"messages": [{"media_files": ["a.jpg"]}]}},
+            "orphaned_media": [{"media_file": "b.jpg"}],
+        }
+
+        SnapchatPreprocessor(tmp_path)._deduplicate_media_messages(metadata, file_catalog)
+
+        assert sorted(hashed) == [str(tmp_path / "a.jpg"), str(tmp_path / "b.jpg")]
+
+    def test_unique_sizes_skip_hashing(self, tmp_path, monkeypatch):
+        """Should hash only same-size media and still merge repeats of one file."""
+        import os
+
+        from processors.snapchat_messages.preprocess import SnapchatPreprocessor
+
+        hashed = []
+        real_hash = SnapchatPreprocessor._compute_file_hash
+        monkeypatch.setattr(
+            SnapchatPreprocessor,
+            "_compute_file_hash",
+            lambda self, path: hashed.append(os.path.basename(path)) or real_hash(self, path),
+        )
+
+        media_dir = tmp_path / "chat_media"
+        media_dir.mkdir()
+        for name, content in (
+            ("2021-01-01_b~a.jpg", b"same"),
+            ("2021-01-01_b~b.jpg", b"same"),
+            ("2021-01-01_b~c.jpg", b"unique"),
+        ):
+            (media_dir / name).write_bytes(content)
+
+        preprocessor = SnapchatPreprocessor(tmp_path)
+        file_catalog = preprocessor.build_file_catalog()
+        assert hashed == []
+
+        metadata = {
+            "conversations": {
+                conv_id: {"messages": [{"conversation_id": conv_id, "created": created, "media_file": name}]}
+                for conv_id, created, name in (
+                    ("dm1", "2021-01-01 00:00:00 UTC", "2021-01-01_b~a.jpg"),
+                    ("dm2", "2021-01-02 00:00:00 UTC", "2021-01-01_b~b.jpg"),
+                    ("dm3", "2021-01-03 00:00:00 UTC", "2021-01-01_b~c.jpg"),
+                    ("dm4", "2021-01-04 00:00:00 UTC", "2021-01-01_b~c.jpg"),
+                )
+            }
+        }
+        result = preprocessor._deduplicate_media_messages(metadata, file_catalog)
+
+        assert sorted(hashed) == ["2021-01-01_b~a.jpg", "2021-01-01_b~b.jpg"]
+        conversations = result["conversations"]
+        assert conversations["dm2"]["messages"] == []
+        assert conversations["dm4"]["messages"] == []
+        assert preprocessor.stats["duplicate_files"] == 2
+
+    def test_file_hash_matches_content_hash(self, tmp_path):
+        """Should hash mapped and empty files like hashing their bytes."""
+        import xxhash
+
+        from processors.snapchat_messages.preprocess import SnapchatPreprocessor
+
+        preprocessor = SnapchatPreprocessor(tmp_path)
+        for name, content in (("a.jpg", b"x" * 200_000), ("empty.jpg", b"")):
+            path = tmp_path / name
+            path.write_bytes(content)
+            assert preprocessor._compute_file_hash(path) == xxhash.xxh3_64(content).hexdigest()
+
+
+class TestSnapchatMessagesClassification:
+    """Tests for filename classification."""
+
+    @pytest.mark.parametrize(
+        "filename,expected",
+        [
+            (".DS_Store", "system"),
+            ("._2021-01-01_b~abc.jpg", "system"),
+            ("__MACOSX", "system"),
+            ("2021-01-01_b~abc.jpg", "media"),
+            ("2021-01-01_media~zip-ABC.mp4", "media"),
+            ("2021-01-01_overlay~zip-ABC.png", "overlay"),
+            ("2021-01-01_thumbnail~ABC.jpg", "thumbnail"),
+            ("2021-01-01_" + "a" * 32 + ".JPG", "media"),
+            ("2021-01-01_" + "a" * 32 + ".txt", "unknown"),
+            ("notes~draft.txt", "unknown"),
+        ],
+    )
+    def test_classify_file(self, tmp_path, filename, expected):
+        """Should classify by marker, then by the hash-based pattern."""
+        from processors.snapchat_messages.preprocess import SnapchatPreprocessor
+
+        assert SnapchatPreprocessor(tmp_path).classify_file(filename) == expected
+
+    @pytest.mark.parametrize(
+        "filename",
+        [
+            "2021-01-01_b~abc.jpg",
+            "2021-01-01_b~.jpg",
+            "2021-01-01_B~abc.jpg",
+            "2021-01-01_media~zip-0A1B2C3D-0000-1111-2222-333344445555.mp4",
+            "2021-01-01_media~zip-bad.mp4",
+            "2021-01-01_" + "A" * 32 + ".mp4",
+            "nodate_" + "a" * 32 + ".jpg",
+            "x~zip-0a1b2c3d-0000-1111-2222-333344445555_b~q.mp4",
+        ],
+    )
+    def test_media_keys_pattern_matches_extractors(self, tmp_path, filename):
+        """Should find the same date and media key as the extract_* helpers."""
+        from processors.snapchat_messages.preprocess import SnapchatPreprocessor
+
+        preprocessor = SnapchatPreprocessor(tmp_path)
+        keys = preprocessor.MEDIA_KEYS_PATTERN.match(filename)
+
+        assert keys["date"] == preprocessor.extract_date_from_filename(filename)
+        media_id = preprocessor.extract_media_id(filename)
+        assert (keys["media_id"] and f"b~{keys['media_id']}") == media_id
+        if not media_id:
+            uuid = preprocessor.extract_uuid(filename)
+            assert keys["uuid"] == uuid
+            if not uuid:
+                assert keys["hash"] == preprocessor.extract_hash(filename)